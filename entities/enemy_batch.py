@@ -0,0 +1,322 @@
+"""
+Enemy AI for the whole group at once - per-enemy state in NumPy arrays, one vectorised pass per step
+"""
+import numpy as np
+from utils.spatial_grid import SpatialGroup
+from utils.game_clock import WALL_CLOCK
+
+WANDER_SPEED = 0.3  # Fraction of an enemy's speed used while wandering
+WANDER_INTERVAL = (2000, 4000)  # Milliseconds between wander direction changes
+SEPARATION = 0.5  # Share of an enemy-enemy overlap each of the two enemies resolves
+
+def batch_slot_of(enemy):
+    return enemy.batch_slot
+
+class EnemyBatch(SpatialGroup):
+    """Enemy sprite group whose AI state lives in arrays indexed by each enemy's batch slot
+
+    The sprites keep their rect, health and images for collision, hits and drawing. Adding
+    or killing an enemy assigns or frees its slot. With a room index the slots are also
+    bucketed by the room they stand in (-1 for hallways)."""
+
+    def __init__(self, *sprites, cell_size=64, capacity=64, rng=None, room_index=None, flow_field=None, room_graph=None,
+                 clock=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.clock = clock if clock is not None else WALL_CLOCK  # Time source for attacks and wandering
+        self.room_index = room_index
+        self.flow_field = flow_field  # Chasers follow it around walls when set
+        self.room_graph = room_graph  # Chasers in rooms the field doesn't reach route through the doors with it
+        self.room_buckets = {}  # Room id -> set of slots
+        self.capacity = 0
+        self.slot_enemies = []  # Slot -> enemy (None if free)
+        self.free_slots = []
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.previous_x = np.zeros(0)  # Centers before the last simulation step, for interpolated drawing
+        self.previous_y = np.zeros(0)
+        self.speed = np.zeros(0)
+        self.damage = np.zeros(0, dtype=np.int32)
+        self.detection_range = np.zeros(0)
+        self.attack_range = np.zeros(0)
+        self.attack_cooldown = np.zeros(0)
+        self.last_attack_time = np.zeros(0)
+        self.wander_direction = np.zeros(0)
+        self.wander_timer = np.zeros(0)
+        self.wander_interval = np.zeros(0)
+        self.velocity_x = np.zeros(0)
+        self.velocity_y = np.zeros(0)
+        self.targeting = np.zeros(0, dtype=bool)
+        self.active = np.zeros(0, dtype=bool)
+        self.room_of = np.zeros(0, dtype=np.int32)
+        self.last_update_frame = np.zeros(0, dtype=np.int64)
+        self.grow(capacity)
+        super().__init__(*sprites, cell_size=cell_size)
+
+    def grow(self, capacity):
+        """Enlarge every per-enemy array to hold at least capacity enemies"""
+        extra = capacity - self.capacity
+        if extra <= 0:
+            return
+        for name in ("x", "y", "previous_x", "previous_y", "speed", "damage", "detection_range", "attack_range", "attack_cooldown",
+                     "last_attack_time", "wander_direction", "wander_timer", "wander_interval",
+                     "velocity_x", "velocity_y", "targeting", "active", "room_of", "last_update_frame"):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate((array, np.zeros(extra, dtype=array.dtype))))
+        self.free_slots.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.slot_enemies.extend([None] * extra)
+        self.capacity = capacity
+
+    def add_internal(self, sprite, layer=None):
+        if not self.free_slots:
+            self.grow(self.capacity * 2)
+        slot = self.free_slots.pop()
+        sprite.batch_slot = slot
+        self.slot_enemies[slot] = sprite
+
+        self.x[slot], self.y[slot] = sprite.rect.center
+        self.previous_x[slot], self.previous_y[slot] = sprite.rect.center
+        self.speed[slot] = sprite.speed
+        self.damage[slot] = sprite.damage
+        self.detection_range[slot] = sprite.detection_range
+        self.attack_range[slot] = sprite.attack_range
+        self.attack_cooldown[slot] = sprite.attack_cooldown
+        self.last_attack_time[slot] = sprite.last_attack_time
+        self.wander_direction[slot] = sprite.wander_direction
+        self.wander_timer[slot] = sprite.wander_timer
+        self.wander_interval[slot] = 0
+        self.velocity_x[slot] = self.velocity_y[slot] = 0
+        self.targeting[slot] = False
+        self.active[slot] = True
+        self.last_update_frame[slot] = 0
+        if self.room_index:
+            self.bucket(slot, self.room_index.room_at_point(*sprite.rect.center))
+        super().add_internal(sprite, layer)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        slot = sprite.batch_slot
+        if self.room_index:
+            self.room_buckets[self.room_of[slot]].discard(slot)
+        self.active[slot] = False
+        self.slot_enemies[slot] = None
+        self.free_slots.append(slot)
+
+    def bucket(self, slot, room_id):
+        """Put a slot in a room's bucket"""
+        self.room_of[slot] = room_id
+        bucket = self.room_buckets.get(room_id)
+        if bucket is None:
+            bucket = self.room_buckets[room_id] = set()
+        bucket.add(slot)
+
+    def bucket_rooms(self, room_index):
+        """Start bucketing enemies by room (buckets every enemy already in the group)"""
+        self.room_index = room_index
+        self.room_buckets = {}
+        for slot, enemy in enumerate(self.slot_enemies):
+            if enemy is not None:
+                self.bucket(slot, room_index.room_at_point(*enemy.rect.center))
+
+    def save_positions(self):
+        """Remember every enemy's position before a simulation step"""
+        self.previous_x[:] = self.x
+        self.previous_y[:] = self.y
+
+    def render_rect(self, enemy, alpha):
+        """An enemy's rect between its previous and current step's position"""
+        slot = enemy.batch_slot
+        x = self.previous_x[slot] + (self.x[slot] - self.previous_x[slot]) * alpha
+        y = self.previous_y[slot] + (self.y[slot] - self.previous_y[slot]) * alpha
+        rect = enemy.rect
+        return rect.move(round(x) - rect.centerx, round(y) - rect.centery)
+
+    def think(self, slots, player_x, player_y, now, dt):
+        """Target, steer and check attacks for a set of slots, returns the slots that attack this step
+
+        dt is how many seconds of movement each slot makes (scalar or per-slot array)."""
+        dx = player_x - self.x[slots]
+        dy = player_y - self.y[slots]
+        distance = np.hypot(dx, dy)
+
+        # Target acquisition
+        targeting = distance <= self.detection_range[slots]
+        self.targeting[slots] = targeting
+
+        # Chase the player until within attack range, catching up without overshooting it
+        attack_range = self.attack_range[slots]
+        chasing = targeting & (distance > attack_range)
+        speed = self.speed[slots]
+        chase_distance = np.minimum(speed * dt, distance - attack_range)
+        chase_x = dx
+        chase_y = dy
+        chase_length = distance
+
+        # Head for the next tile on the flow field's path instead of straight at the player,
+        # except in the player's own tile or where the field doesn't reach
+        unreached = chasing
+        if self.flow_field is not None and chasing.any():
+            tile, next_tile = self.flow_field.next_tiles(self.x[slots], self.y[slots])
+            unreached = chasing & (next_tile < 0)
+            follow = chasing & (next_tile >= 0) & (next_tile != tile)
+            if follow.any():
+                next_x, next_y = self.flow_field.tile_centers(next_tile[follow])
+                chase_x = dx.copy()
+                chase_y = dy.copy()
+                chase_x[follow] = next_x - self.x[slots][follow]
+                chase_y[follow] = next_y - self.y[slots][follow]
+                chase_length = np.hypot(chase_x, chase_y)
+
+        # The field stops at the player's room, chasers standing in another room take the room graph's route
+        if self.room_graph is not None and unreached.any():
+            if chase_x is dx:
+                chase_x = dx.copy()
+                chase_y = dy.copy()
+            for i in np.flatnonzero(unreached).tolist():
+                step_to = self.route_step(self.x[slots[i]], self.y[slots[i]], player_x, player_y)
+                if step_to is not None:
+                    chase_x[i] = step_to[0] - self.x[slots[i]]
+                    chase_y[i] = step_to[1] - self.y[slots[i]]
+            chase_length = np.hypot(chase_x, chase_y)
+
+        step = np.divide(chase_distance, chase_length, out=np.zeros(len(slots)), where=chasing & (chase_length > 0))
+        velocity_x = chase_x * step
+        velocity_y = chase_y * step
+
+        # Everyone else wanders, picking a new direction (and how long to keep it) when it runs out
+        wandering = ~targeting
+        timer = self.wander_timer[slots]
+        change = wandering & ((timer == 0) | (now - timer > self.wander_interval[slots]))
+        if change.any():
+            changed = slots[change]
+            self.wander_direction[changed] = self.rng.uniform(0, 2 * np.pi, len(changed))
+            self.wander_interval[changed] = self.rng.integers(WANDER_INTERVAL[0], WANDER_INTERVAL[1] + 1, len(changed))
+            self.wander_timer[changed] = now
+        wander_speed = speed * WANDER_SPEED * dt
+        direction = self.wander_direction[slots]
+        velocity_x = np.where(wandering, np.cos(direction) * wander_speed, velocity_x)
+        velocity_y = np.where(wandering, np.sin(direction) * wander_speed, velocity_y)
+        self.velocity_x[slots] = velocity_x
+        self.velocity_y[slots] = velocity_y
+
+        # Attack eligibility (distance before this step's move, like the chase)
+        attacking = (targeting & (distance <= self.attack_range[slots]) &
+                     (now - self.last_attack_time[slots] >= self.attack_cooldown[slots]))
+        attackers = slots[attacking]
+        self.last_attack_time[attackers] = now
+        return attackers
+
+    def route_step(self, x, y, target_x, target_y):
+        """Pixel center of the next tile on the room graph's path between two positions, or None"""
+        tile_size = self.room_graph.collider.tile_size
+        path = self.room_graph.find_path(int(x) // tile_size, int(y) // tile_size,
+                                         int(target_x) // tile_size, int(target_y) // tile_size)
+        if not path or len(path) < 2:
+            return None
+        next_x, next_y = path[1]
+        return next_x * tile_size + tile_size / 2, next_y * tile_size + tile_size / 2
+
+    def update_slots(self, slots, player, dt, now=None):
+        """Run the AI for a set of slots over dt seconds, then move them with collision"""
+        if not len(slots):
+            return
+        if now is None:
+            now = self.clock.get_ticks()
+
+        attackers = self.think(slots, player.rect.centerx, player.rect.centery, now, dt)
+        for slot in attackers.tolist():
+            player.take_damage(int(self.damage[slot]))
+
+        # Collision resolution stays per enemy against the tilemap
+        slot_enemies = self.slot_enemies
+        new_x = self.x[slots] + self.velocity_x[slots]
+        new_y = self.y[slots] + self.velocity_y[slots]
+        for slot, x, y, targeting in zip(slots.tolist(), new_x.tolist(), new_y.tolist(), self.targeting[slots].tolist()):
+            enemy = slot_enemies[slot]
+            enemy.image = enemy.targeting_image if targeting else enemy.normal_image
+            self.place(slot, x, y)
+
+        self.separate(slots, player)
+
+    def place(self, slot, x, y):
+        """Move an enemy's center to a float position, stopping at walls
+
+        Positions are kept as floats in the arrays and the rect is moved by whole pixels,
+        so slow enemies still make progress."""
+        enemy = self.slot_enemies[slot]
+        rect = enemy.rect
+        move_x = round(x) - rect.centerx
+        move_y = round(y) - rect.centery
+        if move_x or move_y:
+            blocked_x, blocked_y = enemy.collider.move(rect, move_x, move_y)
+            if blocked_x:
+                x = rect.centerx
+            if blocked_y:
+                y = rect.centery
+            self.spatial_grid.move(enemy, None, rect)
+
+            # Keep the room buckets current as enemies walk between rooms and hallways
+            if self.room_index:
+                room_id = self.room_index.room_at_point(*rect.center)
+                if room_id != self.room_of[slot]:
+                    self.room_buckets[self.room_of[slot]].discard(slot)
+                    self.bucket(slot, room_id)
+
+        self.x[slot] = x
+        self.y[slot] = y
+
+    def separate(self, slots, player=None):
+        """Push overlapping enemies apart, and out of the player, using neighbour queries on the grid
+
+        Each enemy moves itself half of every overlap (the whole overlap with the player) along the
+        axis that overlaps least, so a pair updated in the same frame ends up just touching."""
+        slot_enemies = self.slot_enemies
+        x = self.x
+        y = self.y
+        pushes = []
+        for slot in slots.tolist():
+            enemy = slot_enemies[slot]
+            rect = enemy.rect
+            push_x = push_y = 0.0
+
+            # Neighbours in slot order (grid cells are sets) so runs are repeatable
+            for other in sorted(self.spatial_grid.query(rect), key=batch_slot_of):
+                if other is enemy or not rect.colliderect(other.rect):
+                    continue
+                other_slot = other.batch_slot
+                push = self.push_out(x[slot] - x[other_slot], y[slot] - y[other_slot],
+                                     (rect.width + other.rect.width) / 2, (rect.height + other.rect.height) / 2,
+                                     slot < other_slot)
+                push_x += push[0] * SEPARATION
+                push_y += push[1] * SEPARATION
+
+            if push_x or push_y:
+                pushes.append((slot, push_x, push_y))
+
+        # Apply after measuring so the result doesn't depend on update order
+        for slot, push_x, push_y in pushes:
+            self.place(slot, x[slot] + push_x, y[slot] + push_y)
+
+        # The player always wins - enemies are pushed fully out of it last
+        if player is not None:
+            player_rect = player.rect
+            # Collected first, pushing an enemy can move it to another grid cell
+            for enemy in sorted(self.spatial_grid.query(player_rect), key=batch_slot_of):
+                rect = enemy.rect
+                if not rect.colliderect(player_rect):
+                    continue
+                slot = enemy.batch_slot
+                push = self.push_out(x[slot] - player_rect.centerx, y[slot] - player_rect.centery,
+                                     (rect.width + player_rect.width) / 2, (rect.height + player_rect.height) / 2, True)
+                self.place(slot, x[slot] + push[0], y[slot] + push[1])
+
+    def push_out(self, dx, dy, half_width, half_height, tie_first):
+        """Smallest (x, y) move that separates two boxes whose centers are dx, dy apart"""
+        overlap_x = half_width - abs(dx)
+        overlap_y = half_height - abs(dy)
+        if overlap_x <= 0 or overlap_y <= 0:
+            return 0.0, 0.0
+        if overlap_x < overlap_y:
+            direction = 1 if dx > 0 or (dx == 0 and tie_first) else -1
+            return overlap_x * direction, 0.0
+        direction = 1 if dy > 0 or (dy == 0 and tie_first) else -1
+        return 0.0, overlap_y * direction
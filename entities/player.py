@@ -1,14 +1,31 @@
 import pygame
 import math
+from utils.assets import get_image
+from utils.game_clock import WALL_CLOCK
+
+def keyboard_direction():
+    """Movement direction from the WASD keys (S wins over W and D over A)"""
+    dx, dy = 0, 0
+    keys = pygame.key.get_pressed()
+    if keys[pygame.K_w]: dy = -1
+    if keys[pygame.K_s]: dy = 1
+    if keys[pygame.K_a]: dx = -1
+    if keys[pygame.K_d]: dx = 1
+    return dx, dy
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, x, y, walls):
+    def __init__(self, x, y, collider, clock=None):
         super().__init__()
-        self.image = pygame.Surface((40, 40))
-        self.image.fill((0, 255, 0))  # Green square
+        self.image = get_image("player")  # Shared green square
         self.rect = self.image.get_rect(topleft=(x, y))
-        self.speed = 5
-        self.walls = walls
+        self.speed = 300  # pixels per second
+        self.collider = collider
+        self.clock = clock if clock is not None else WALL_CLOCK  # Time source for the shot cooldown
+        
+        # Float top-left so movement smaller than a pixel per step isn't lost,
+        # and where it was before the last step for interpolated drawing
+        self.x, self.y = float(x), float(y)
+        self.previous_x, self.previous_y = self.x, self.y
         
         # Health system
         self.health = 100
@@ -19,39 +36,36 @@ class Player(pygame.sprite.Sprite):
         self.shot_cooldown = 200  # milliseconds
 
     def move(self, dx, dy):
-        # Horizontal movement
-        self.rect.x += dx
-        collided = pygame.sprite.spritecollideany(self, self.walls)
-        if collided:
-            if dx > 0:
-                self.rect.right = collided.rect.left
-            elif dx < 0:
-                self.rect.left = collided.rect.right
+        # Axis-separated movement against the tiles under the player
+        if round(self.x) != self.rect.x or round(self.y) != self.rect.y:
+            self.x, self.y = float(self.rect.x), float(self.rect.y)  # Rect was moved from outside
+        x = self.x + dx
+        y = self.y + dy
+        blocked_x, blocked_y = self.collider.move(self.rect, round(x) - self.rect.x, round(y) - self.rect.y)
+        self.x = float(self.rect.x) if blocked_x else x
+        self.y = float(self.rect.y) if blocked_y else y
 
-    # Vertical movement
-        self.rect.y += dy
-        collided = pygame.sprite.spritecollideany(self, self.walls)
-        if collided:
-            if dy > 0:
-                self.rect.bottom = collided.rect.top
-            elif dy < 0:
-                self.rect.top = collided.rect.bottom
+    def handle_input(self, dt, direction):
+        """Move for one step along a direction of -1, 0 or 1 per axis"""
+        step = self.speed * dt
+        self.move(direction[0] * step, direction[1] * step)
 
-    def handle_input(self):
-        dx, dy = 0, 0
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_w]: dy = -self.speed
-        if keys[pygame.K_s]: dy = self.speed
-        if keys[pygame.K_a]: dx = -self.speed
-        if keys[pygame.K_d]: dx = self.speed
-        self.move(dx, dy)
+    def save_position(self):
+        """Remember the position before a simulation step"""
+        self.previous_x, self.previous_y = self.x, self.y
 
-    def update(self):
-        self.handle_input()
+    def update(self, dt, direction):
+        self.save_position()
+        self.handle_input(dt, direction)
 
-    def shoot(self, mouse_x, mouse_y, camera):
-        """Shoot a bullet toward the mouse cursor"""
-        current_time = pygame.time.get_ticks()
+    def render_rect(self, alpha):
+        """Rect between the previous and current step's position"""
+        return self.rect.move(round(self.previous_x + (self.x - self.previous_x) * alpha) - self.rect.x,
+                              round(self.previous_y + (self.y - self.previous_y) * alpha) - self.rect.y)
+
+    def shoot(self, mouse_x, mouse_y, camera, projectiles):
+        """Shoot a bullet toward the mouse cursor, returns its projectile slot or None"""
+        current_time = self.clock.get_ticks()
         if current_time - self.last_shot_time < self.shot_cooldown:
             return None
             
@@ -59,11 +73,11 @@ class Player(pygame.sprite.Sprite):
         world_mouse_x = mouse_x + camera.rect.x
         world_mouse_y = mouse_y + camera.rect.y
         
-        # Create bullet with target coordinates
-        from entities.bullet import Bullet
-        bullet = Bullet(self.rect.centerx, self.rect.centery, world_mouse_x, world_mouse_y, self.walls)
-        self.last_shot_time = current_time
-        return bullet
+        # Fire from the center toward the target
+        slot = projectiles.spawn(self.rect.centerx, self.rect.centery, world_mouse_x, world_mouse_y)
+        if slot is not None:
+            self.last_shot_time = current_time
+        return slot
     
     def take_damage(self, damage):
         """Take damage and return True if player dies"""
@@ -72,26 +86,3 @@ class Player(pygame.sprite.Sprite):
             self.health = 0
             return True
         return False
-    
-    def draw_health_bar(self, screen, camera):
-        """Draw player health bar"""
-        bar_width = 200
-        bar_height = 20
-        health_ratio = self.health / self.max_health
-        
-        # Position at top of screen
-        bar_x = 10
-        bar_y = 10
-        
-        # Background (dark red)
-        pygame.draw.rect(screen, (100, 0, 0), (bar_x, bar_y, bar_width, bar_height))
-        # Health (green)
-        pygame.draw.rect(screen, (0, 255, 0), (bar_x, bar_y, bar_width * health_ratio, bar_height))
-        # Border
-        pygame.draw.rect(screen, (255, 255, 255), (bar_x, bar_y, bar_width, bar_height), 2)
-        
-        # Health text
-        font = pygame.font.Font(None, 24)
-        health_text = f"HP: {self.health}/{self.max_health}"
-        text_surface = font.render(health_text, True, (255, 255, 255))
-        screen.blit(text_surface, (bar_x + bar_width + 10, bar_y))
\ No newline at end of file
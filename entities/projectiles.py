@@ -0,0 +1,221 @@
+"""
+Struct-of-arrays projectile system - every bullet lives in preallocated NumPy arrays and is stepped in one go
+"""
+import math
+import numpy as np
+import pygame
+from utils.assets import get_image
+
+KEY_OFFSET = 1 << 10  # Keeps cell coordinates slightly left/above the map positive
+KEY_STRIDE = 1 << 20
+
+class ProjectileSystem:
+    def __init__(self, collider, capacity=4096, speed=480, damage=2, max_distance=400,
+                 image_name="bullet", cell_size=80):
+        self.collider = collider
+        self.tile_size = collider.tile_size
+        self.capacity = capacity
+        self.speed = speed  # pixels per second
+        self.default_damage = damage
+        self.max_distance = max_distance
+        self.cell_size = cell_size  # Bucket size for the enemy broadphase
+
+        # Every projectile is drawn with the same shared (square) image
+        self.image = get_image(image_name)
+        self.size = self.image.get_width()
+        self.half_size = self.size // 2
+
+        # One slot per projectile
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.previous_x = np.zeros(capacity)  # Positions before the last step, for interpolated drawing
+        self.previous_y = np.zeros(capacity)
+        self.velocity_x = np.zeros(capacity)
+        self.velocity_y = np.zeros(capacity)
+        self.distance_traveled = np.zeros(capacity)
+        self.damage = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        # Free slots, popped from the end so low slots are reused first
+        self.free_slots = list(range(capacity - 1, -1, -1))
+
+        # Solid tile types as a lookup table over the raw tile bytes
+        self.solid_lookup = np.zeros(256, dtype=bool)
+        self.solid_lookup[list(collider.solid_tiles)] = True
+
+        # (tile_x, tile_y, hit_x, hit_y) of every wall hit in the last step
+        self.impacts = []
+
+    def __len__(self):
+        return self.capacity - len(self.free_slots)
+
+    def spawn(self, start_x, start_y, target_x, target_y, speed=None, damage=None):
+        """Fire a projectile toward a target, returns its slot or None if the pool is full"""
+        if not self.free_slots:
+            return None
+
+        speed = self.speed if speed is None else speed
+        dx = target_x - start_x
+        dy = target_y - start_y
+        distance = math.hypot(dx, dy)
+
+        slot = self.free_slots.pop()
+        self.x[slot] = self.previous_x[slot] = start_x
+        self.y[slot] = self.previous_y[slot] = start_y
+        if distance > 0:
+            self.velocity_x[slot] = dx / distance * speed
+            self.velocity_y[slot] = dy / distance * speed
+        else:
+            self.velocity_x[slot] = 0
+            self.velocity_y[slot] = 0
+        self.distance_traveled[slot] = 0
+        self.damage[slot] = self.default_damage if damage is None else damage
+        self.alive[slot] = True
+        return slot
+
+    def kill(self, slot):
+        """Free one projectile's slot"""
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self.free_slots.append(slot)
+
+    def kill_slots(self, slots):
+        """Free an array of live slots at once"""
+        self.alive[slots] = False
+        self.free_slots.extend(slots.tolist())
+
+    def step(self, dt, enemies=None, cull_center=None, cull_distance=None):
+        """Advance every live projectile by dt seconds, returns the (slot, enemy) hits in slot order
+
+        Projectiles further than cull_distance (Manhattan) from cull_center are dropped first.
+        Projectiles that hit a wall die, ones that hit an enemy are left for the caller to resolve."""
+        self.impacts = []
+        live = np.flatnonzero(self.alive)
+        if not len(live):
+            return []
+
+        if cull_center is not None:
+            far = (np.abs(self.x[live] - cull_center[0]) + np.abs(self.y[live] - cull_center[1])) > cull_distance
+            if far.any():
+                self.kill_slots(live[far])
+                live = live[~far]
+
+        velocity_x = self.velocity_x[live]
+        velocity_y = self.velocity_y[live]
+        start_x = self.x[live]
+        start_y = self.y[live]
+        end_x = start_x + velocity_x * dt
+        end_y = start_y + velocity_y * dt
+        self.previous_x[live] = start_x
+        self.previous_y[live] = start_y
+        self.x[live] = end_x
+        self.y[live] = end_y
+
+        traveled = self.distance_traveled[live] + (np.abs(velocity_x) + np.abs(velocity_y)) * dt
+        self.distance_traveled[live] = traveled
+
+        # Out of range, then walls along this step's segment
+        dead = traveled > self.max_distance
+        dead |= self.find_wall_hits(live, start_x, start_y, end_x, end_y, ~dead)
+        if dead.any():
+            self.kill_slots(live[dead])
+            keep = ~dead
+            live = live[keep]
+            start_x, start_y, end_x, end_y = start_x[keep], start_y[keep], end_x[keep], end_y[keep]
+
+        if enemies is None or not len(live):
+            return []
+        return self.find_enemy_hits(live, start_x, start_y, end_x, end_y, enemies)
+
+    def find_wall_hits(self, live, start_x, start_y, end_x, end_y, check):
+        """Mask of the checked projectiles whose segment enters a solid tile, moving them to the impact point"""
+        tile_size = self.tile_size
+        tilemap = self.collider.tilemap
+        tiles = np.frombuffer(tilemap.buffer, dtype=np.uint8).reshape(tilemap.height, tilemap.width)
+
+        start_tile_x = np.floor_divide(start_x, tile_size).astype(np.intp)
+        start_tile_y = np.floor_divide(start_y, tile_size).astype(np.intp)
+        end_tile_x = np.floor_divide(end_x, tile_size).astype(np.intp)
+        end_tile_y = np.floor_divide(end_y, tile_size).astype(np.intp)
+
+        def solid(tile_x, tile_y):
+            # Everything outside the map is solid
+            inside = (tile_x >= 0) & (tile_x < tilemap.width) & (tile_y >= 0) & (tile_y < tilemap.height)
+            result = np.ones(len(tile_x), dtype=bool)
+            result[inside] = self.solid_lookup[tiles[tile_y[inside], tile_x[inside]]]
+            return result
+
+        # A segment shorter than a tile crosses at most one border per axis, so it can only touch
+        # these four tiles - only segments touching a solid one (or longer ones) need an exact trace
+        candidates = (solid(start_tile_x, start_tile_y) | solid(end_tile_x, end_tile_y) |
+                      solid(end_tile_x, start_tile_y) | solid(start_tile_x, end_tile_y))
+        candidates |= (np.abs(end_x - start_x) >= tile_size) | (np.abs(end_y - start_y) >= tile_size)
+        candidates &= check
+
+        hit = np.zeros(len(live), dtype=bool)
+        for i in np.flatnonzero(candidates).tolist():
+            impact = self.collider.raycast(start_x[i], start_y[i], end_x[i], end_y[i])
+            if impact:
+                hit[i] = True
+                self.x[live[i]], self.y[live[i]] = impact[2], impact[3]
+                self.impacts.append(impact)
+        return hit
+
+    def find_enemy_hits(self, live, start_x, start_y, end_x, end_y, enemies):
+        """Broadphase the projectiles' swept boxes against nearby enemies, nearest enemy to the start wins"""
+        half_size = self.half_size
+        left = np.minimum(start_x, end_x) - half_size
+        right = np.maximum(start_x, end_x) + half_size
+        top = np.minimum(start_y, end_y) - half_size
+        bottom = np.maximum(start_y, end_y) + half_size
+
+        # Group projectiles by the cell of their swept box's top-left corner
+        cell_size = self.cell_size
+        cell_x = np.floor_divide(left, cell_size).astype(np.int64) + KEY_OFFSET
+        cell_y = np.floor_divide(top, cell_size).astype(np.int64) + KEY_OFFSET
+        keys = cell_y * KEY_STRIDE + cell_x
+        order = np.argsort(keys, kind="stable")
+        bounds = np.flatnonzero(np.diff(keys[order])) + 1
+        group_left = np.minimum.reduceat(left[order], np.r_[0, bounds]).astype(np.int64)
+        group_right = np.maximum.reduceat(right[order], np.r_[0, bounds]).astype(np.int64)
+        group_top = np.minimum.reduceat(top[order], np.r_[0, bounds]).astype(np.int64)
+        group_bottom = np.maximum.reduceat(bottom[order], np.r_[0, bounds]).astype(np.int64)
+
+        best = {}  # Projectile index -> (distance, enemy)
+        for group, indices in enumerate(np.split(order, bounds)):
+            # Only enemies near this group's swept boxes are tested against it
+            area = pygame.Rect(int(group_left[group]), int(group_top[group]),
+                               int(group_right[group] - group_left[group]) + 1,
+                               int(group_bottom[group] - group_top[group]) + 1)
+            for enemy in list(enemies.query(area)):
+                rect = enemy.rect
+                overlap = ((left[indices] < rect.right) & (right[indices] > rect.left) &
+                           (top[indices] < rect.bottom) & (bottom[indices] > rect.top))
+                for i in indices[overlap].tolist():
+                    distance = abs(rect.centerx - start_x[i]) + abs(rect.centery - start_y[i])
+                    if i not in best or distance < best[i][0]:
+                        best[i] = (distance, enemy)
+
+        return [(int(live[i]), best[i][1]) for i in sorted(best)]
+
+    def screen_positions(self, camera_rect, alpha=1.0):
+        """Return (slots, screen_xs, screen_ys) of the projectiles whose image is on screen
+
+        alpha places them between their previous and current step's position."""
+        live = np.flatnonzero(self.alive)
+        x = self.x[live]
+        y = self.y[live]
+        if alpha != 1.0:
+            x = self.previous_x[live] + (x - self.previous_x[live]) * alpha
+            y = self.previous_y[live] + (y - self.previous_y[live]) * alpha
+        screen_x = np.rint(x).astype(np.intp) - (self.half_size + camera_rect.x)
+        screen_y = np.rint(y).astype(np.intp) - (self.half_size + camera_rect.y)
+        visible = ((screen_x > -self.size) & (screen_x < camera_rect.width) &
+                   (screen_y > -self.size) & (screen_y < camera_rect.height))
+        return live[visible].tolist(), screen_x[visible].tolist(), screen_y[visible].tolist()
+
+    def draw(self, screen, camera_rect, alpha=1.0):
+        """Blit every on-screen projectile in one call"""
+        slots, screen_x, screen_y = self.screen_positions(camera_rect, alpha)
+        image = self.image
+        screen.blits([(image, position) for position in zip(screen_x, screen_y)], False)
@@ -0,0 +1,24 @@
+"""
+Compact enemy spawn descriptors - enemies are only created when their room is first discovered
+"""
+from entities.enemy import Enemy
+
+class EnemySpawn:
+    """Everything needed to create one enemy later: type and position"""
+    __slots__ = ("enemy_type", "x", "y")
+
+    def __init__(self, enemy_type, x, y):
+        self.enemy_type = enemy_type
+        self.x = x
+        self.y = y
+
+    def create(self, collider):
+        """Build the enemy sprite this descriptor stands for"""
+        return Enemy(self.x, self.y, collider, self.enemy_type)
+
+def materialise_room(room_id, room_spawns, enemies, collider):
+    """Create and add the pending enemies of a room (once), returns how many were created"""
+    spawns = room_spawns.pop(room_id, ())
+    for spawn in spawns:
+        enemies.add(spawn.create(collider))
+    return len(spawns)
@@ -2,24 +2,39 @@ import pygame
 import sys
 import random
 import math
-from utils.room_generator import generate_rooms, connect_rooms
-from entities.player import Player
-from entities.wall import Wall
-from entities.enemy import Enemy
-from entities.bullet import Bullet
+from entities.player import Player, keyboard_direction
+from entities.spawn import materialise_room
+from entities.enemy_batch import EnemyBatch
+from entities.projectiles import ProjectileSystem
 from utils.camera import Camera
-from utils.spatial_grid import SpatialGrid
+from utils.collision import TileCollider
+from utils.tilemap import TileMap, FLOOR, WALL, DOOR, CHEST_UNLOCKED, CHEST_LOCKED, HOLE, CHEST_OPENED
+from utils.tile_renderer import ChunkedTileLayer, FogOverlayLayer
+from utils.wall_mask import WallEdgeMask
+from utils.hud import HudLayer
+from utils.dirty_rects import DirtyRectTracker, draw_outline
+from utils.room_index import RoomIndex
+from utils.visibility import Visibility
+from utils.lod_scheduler import LodScheduler
+from utils.flow_field import FlowField
+from utils.room_graph import RoomGraph
+from utils.game_clock import GameClock
+from utils.world_gen import WorldConfig, generate_world, generate_world_parallel, start_pool
+from utils.world_pool import WorldPool
 from scenes.hole_room import HoleRoom
 
-# Initialize Pygame
-pygame.init()
-
 # Global Settings
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 900
 WORLD_WIDTH = 6400  # Increased map size (160 tiles) for better room placement
 WORLD_HEIGHT = 5200  # Increased map size (130 tiles) for better room placement  
-FPS = 60
+FPS = 60  # Frames drawn per second (can be lower than SIM_RATE)
+SIM_RATE = 120  # Fixed simulation steps per second
+SIM_DT = 1 / SIM_RATE
+MAX_FRAME_TIME = 0.25  # Seconds of real time a single frame may simulate at most
+PARALLEL_WORLD_GEN = True  # Try seeded world attempts on a process pool, first valid attempt wins
+PREGENERATED_WORLDS = 2  # Worlds kept ready in the background for the next runs (0 turns it off)
+DIRTY_RECT_UPDATES = False  # Only redraw and present the changed parts of the screen while the camera is still
 TILE_SIZE = 40
 GRID_WIDTH = WORLD_WIDTH // TILE_SIZE
 GRID_HEIGHT = WORLD_HEIGHT // TILE_SIZE
@@ -38,27 +53,39 @@ HOLE_COLOR = (20, 20, 20)  # Dark gray for hole tiles
 OPENED_CHEST_COLOR = (139, 69, 19)  # Saddle brown for opened chests
 INTERACTION_RING_COLOR = (255, 255, 0)  # Yellow ring for interactable objects
 INTERACTION_DISTANCE = 60  # Pixels - how close player needs to be to interact
-# Set up screen and clock
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED | pygame.FULLSCREEN)
-pygame.display.set_caption("Procedural Roguelike TD Puzzle Game")
-clock = pygame.time.Clock()
+# Screen and clock, set up by init_display() when the game starts - not at import, because
+# spawned world generation workers import this module too
+screen = None
+clock = None
 
 # Set up camera
 camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
 
-tilemap = [[1 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-fogmap = [[False for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-exploredmap = [[False for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+tilemap = TileMap(GRID_WIDTH, GRID_HEIGHT, fill=WALL)
 room_discovered = {}  # Track which rooms have been discovered
-hallway_networks = {}  # Cache revealed hallway networks to avoid repeated flood-fills
-
-fog_tile = pygame.Surface((TILE_SIZE, TILE_SIZE))
-fog_tile.set_alpha(180)
-fog_tile.fill((0, 0, 0))
+world_executor = None  # Process pool shared by all world generation, started before the display
+world_pool = None  # Worlds for the next runs generated in the background, started once the first world exists
 
 # Track opened chests (store center coordinates of 2x2 chests)
 opened_chests = set()
 
+def init_display():
+    """Initialize Pygame and open the game window"""
+    global screen, clock
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED | pygame.FULLSCREEN)
+    pygame.display.set_caption("Procedural Roguelike TD Puzzle Game")
+    clock = pygame.time.Clock()
+
+def quit_game():
+    """Stop world generation, close the window and exit"""
+    if world_pool is not None:
+        world_pool.close()
+    if world_executor is not None:
+        world_executor.shutdown(wait=False, cancel_futures=True)
+    pygame.quit()
+    sys.exit()
+
 def find_chest_center_near_player(player_rect, tilemap, tile_size, interaction_distance):
     """Find the center of a 2x2 chest near the player"""
     player_center_x = player_rect.centerx
@@ -79,7 +106,7 @@ def find_chest_center_near_player(player_rect, tilemap, tile_size, interaction_d
                 continue
                 
             # Check if this is a chest tile
-            if tilemap[check_y][check_x] in [3, 4]:  # Unlocked or locked chest
+            if tilemap[check_y][check_x] in (CHEST_UNLOCKED, CHEST_LOCKED):
                 # Find the top-left corner of the 2x2 chest
                 chest_top_left_x, chest_top_left_y = find_chest_top_left(check_x, check_y, tilemap)
                 
@@ -105,7 +132,7 @@ def find_chest_center_near_player(player_rect, tilemap, tile_size, interaction_d
                 distance = ((player_center_x - closest_x) ** 2 + (player_center_y - closest_y) ** 2) ** 0.5
                 
                 if distance <= interaction_distance:
-                    chest_type = "unlocked" if tilemap[check_y][check_x] == 3 else "locked"
+                    chest_type = "unlocked" if tilemap[check_y][check_x] == CHEST_UNLOCKED else "locked"
                     return {
                         'center_x': chest_top_left_x + 1,  # Grid coordinates of center
                         'center_y': chest_top_left_y + 1,
@@ -155,51 +182,12 @@ def open_chest(chest_info, tilemap, opened_chests):
     # Open the chest - mark as opened
     opened_chests.add(chest_center)
     
-    # Change all 4 tiles of the 2x2 chest to opened chest tiles (tile type 6)
-    top_left_x = chest_info['top_left_x']
-    top_left_y = chest_info['top_left_y']
-    
-    tilemap[top_left_y][top_left_x] = 6  # New opened chest tile type
-    tilemap[top_left_y][top_left_x + 1] = 6
-    tilemap[top_left_y + 1][top_left_x] = 6
-    tilemap[top_left_y + 1][top_left_x + 1] = 6
+    # Change all 4 tiles of the 2x2 chest to opened chest tiles
+    tilemap.fill_rect(chest_info['top_left_x'], chest_info['top_left_y'], 2, 2, CHEST_OPENED)
     
     print(f"✨ Opened {chest_info['type']} chest! You found some treasure!")
     return True, "You found some treasure!"
 
-def spawn_enemies_in_rooms(rooms, walls, tile_size):
-    """Spawn enemies randomly in rooms (excluding spawn room, chest rooms, and shop rooms)"""
-    enemies = pygame.sprite.Group()
-    enemy_types = ["basic", "fast", "tank"]
-    
-    # Skip spawn room, chest rooms, and shop rooms
-    eligible_rooms = []
-    for room in rooms:
-        if room.room_type == "normal":  # Only normal rooms get enemies
-            eligible_rooms.append(room)
-    
-    for room in eligible_rooms:
-        # Number of enemies per room (1-3)
-        num_enemies = random.randint(1, 3)
-        
-        for _ in range(num_enemies):
-            # Random position within room bounds (with some padding)
-            padding = tile_size
-            x = random.randint(room.rect.left + padding, room.rect.right - padding)
-            y = random.randint(room.rect.top + padding, room.rect.bottom - padding)
-            
-            # Random enemy type with weighted probability
-            enemy_type = random.choices(
-                enemy_types, 
-                weights=[60, 30, 10],  # Basic: 60%, Fast: 30%, Tank: 10%
-                k=1
-            )[0]
-            
-            enemy = Enemy(x, y, walls, enemy_type)
-            enemies.add(enemy)
-    
-    return enemies
-
 def play_hole_room_scene(player_stats):
     """Play the hole room scene"""
     # Create hole room
@@ -208,273 +196,127 @@ def play_hole_room_scene(player_stats):
     # Create new camera for hole room
     hole_camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
     
-    # Create walls for hole room
-    hole_walls = pygame.sprite.Group()
-    for y, row in enumerate(hole_room.tilemap):
-        for x, tile in enumerate(row):
-            if tile == 1:  # Wall tiles
-                wall = Wall(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE)
-                hole_walls.add(wall)
+    # Collide directly against the hole room's wall tiles
+    hole_collider = TileCollider(hole_room.tilemap, TILE_SIZE, solid_tiles=(WALL,))
     
-    # Create player at spawn position
-    hole_player = Player(hole_room.spawn_x, hole_room.spawn_y, hole_walls)
+    # Bake the hole room tiles, drawing only the wall edges from its mask
+    hole_layer = ChunkedTileLayer(
+        hole_room.tilemap, TILE_SIZE,
+        tile_colors={FLOOR: FLOOR_COLOR, WALL: WALL_COLOR},
+        background_color=WALL_COLOR,
+        wall_mask=hole_room.wall_mask
+    )
+    
+    # Create player at spawn position, on a fresh game clock
+    hole_clock = GameClock()
+    hole_player = Player(hole_room.spawn_x, hole_room.spawn_y, hole_collider, hole_clock)
     # Restore player stats
     hole_player.health = player_stats['health']
     hole_player.max_health = player_stats['max_health']
     
-    # Create bullet group
-    hole_bullets = pygame.sprite.Group()
+    # Pooled projectiles
+    hole_projectiles = ProjectileSystem(hole_collider)
+    
+    # Cached HUD (health bar only, no FPS or crosshair down here)
+    hole_hud = HudLayer()
     
-    # Hole room game loop
+    # Hole room game loop, on the same fixed simulation steps as the main game
+    accumulator = 0.0
     hole_running = True
     while hole_running:
-        clock.tick(FPS)
-        hole_camera.move_to(hole_player.rect)
+        accumulator += min(clock.tick(FPS) / 1000, MAX_FRAME_TIME)
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                pygame.quit()
-                sys.exit()
+                quit_game()
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left mouse button
                     mouse_x, mouse_y = pygame.mouse.get_pos()
-                    bullet = hole_player.shoot(mouse_x, mouse_y, hole_camera)
-                    if bullet:
-                        hole_bullets.add(bullet)
+                    hole_player.shoot(mouse_x, mouse_y, hole_camera, hole_projectiles)
         
-        # Update player and bullets
-        hole_player.update()
-        
-        # Update hole room bullets - remove bullets that are far off-screen
-        hole_bullets_to_update = []
-        hole_camera_center_x = hole_camera.rect.centerx
-        hole_camera_center_y = hole_camera.rect.centery
-        max_update_distance = SCREEN_WIDTH + SCREEN_HEIGHT
-        
-        for bullet in hole_bullets:
-            # Calculate distance from camera center
-            bullet_center_x = bullet.rect.centerx
-            bullet_center_y = bullet.rect.centery
-            distance = abs(hole_camera_center_x - bullet_center_x) + abs(hole_camera_center_y - bullet_center_y)
+        direction = keyboard_direction()
+        while accumulator >= SIM_DT:
+            # Update player and bullets
+            hole_player.update(SIM_DT, direction)
             
-            if distance <= max_update_distance:
-                hole_bullets_to_update.append(bullet)
-            else:
-                bullet.kill()
+            # Step all bullets at once, dropping the ones far off-screen
+            hole_projectiles.step(SIM_DT, cull_center=hole_player.rect.center,
+                                  cull_distance=SCREEN_WIDTH + SCREEN_HEIGHT)
+            accumulator -= SIM_DT
+            hole_clock.advance(SIM_DT)
         
-        for bullet in hole_bullets_to_update:
-            bullet.update()
+        # Draw between the last two steps
+        alpha = accumulator / SIM_DT
+        hole_player_rect = hole_player.render_rect(alpha)
+        hole_camera.move_to(hole_player_rect)
         
         # No exit functionality - player is stuck in this room
         
         # Draw hole room
         screen.fill(WALL_COLOR)  # Use wall color for consistency
         
-        # Viewport bounds for hole room
-        x_start = max(hole_camera.rect.left // TILE_SIZE, 0)
-        x_end = min(hole_camera.rect.right // TILE_SIZE + 1, hole_room.room_width)
-        y_start = max(hole_camera.rect.top // TILE_SIZE, 0)
-        y_end = min(hole_camera.rect.bottom // TILE_SIZE + 1, hole_room.room_height)
-        
         # Draw hole room tiles
-        for y in range(y_start, y_end):
-            for x in range(x_start, x_end):
-                if y < len(hole_room.tilemap) and x < len(hole_room.tilemap[y]):
-                    screen_x = x * TILE_SIZE - hole_camera.rect.x
-                    screen_y = y * TILE_SIZE - hole_camera.rect.y
-                    
-                    if hole_room.tilemap[y][x] == 1:
-                        color = WALL_COLOR
-                    else:
-                        color = FLOOR_COLOR
-                    
-                    pygame.draw.rect(screen, color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
+        hole_layer.draw(screen, hole_camera.rect)
         
         # Draw player and bullets (only if on screen)
-        hole_player_screen_rect = hole_camera.apply(hole_player)
+        hole_player_screen_rect = hole_player_rect.move(-hole_camera.rect.x, -hole_camera.rect.y)
         if (hole_player_screen_rect.right >= 0 and hole_player_screen_rect.left < SCREEN_WIDTH and
             hole_player_screen_rect.bottom >= 0 and hole_player_screen_rect.top < SCREEN_HEIGHT):
             screen.blit(hole_player.image, hole_player_screen_rect)
         
-        for bullet in hole_bullets:
-            bullet_screen_rect = hole_camera.apply(bullet)
-            if (bullet_screen_rect.right >= 0 and bullet_screen_rect.left < SCREEN_WIDTH and
-                bullet_screen_rect.bottom >= 0 and bullet_screen_rect.top < SCREEN_HEIGHT):
-                screen.blit(bullet.image, bullet_screen_rect)
+        hole_projectiles.draw(screen, hole_camera.rect, alpha)
         
         # Draw player health bar
-        hole_player.draw_health_bar(screen, hole_camera)
+        hole_hud.draw(screen, hole_player)
         
         pygame.display.flip()
 
-def validate_world(rooms, tilemap):
-    """Validate that a generated world meets all requirements for a playable game"""
-    if not rooms:
-        return False, "No rooms generated"
-    
-    if len(rooms) < ROOM_AMT:
-        return False, f"Only {len(rooms)} rooms generated, need {ROOM_AMT}"
-    
-    # Check for spawn room
-    spawn_rooms = [r for r in rooms if r.room_type == "spawn"]
-    if len(spawn_rooms) != 1:
-        return False, f"Found {len(spawn_rooms)} spawn rooms, need exactly 1"
-    
-    # Check for all required special rooms
-    boss_rooms = [r for r in rooms if r.room_type == "boss"]
-    shop_rooms = [r for r in rooms if r.room_type == "shop"]
-    chest_unlocked_rooms = [r for r in rooms if r.room_type == "chest_unlocked"]
-    chest_locked_rooms = [r for r in rooms if r.room_type == "chest_locked"]
-    
-    if len(boss_rooms) != 1:
-        return False, f"Found {len(boss_rooms)} boss rooms, need exactly 1"
-    if len(shop_rooms) != 1:
-        return False, f"Found {len(shop_rooms)} shop rooms, need exactly 1"
-    if len(chest_unlocked_rooms) != 1:
-        return False, f"Found {len(chest_unlocked_rooms)} unlocked chest rooms, need exactly 1"
-    if len(chest_locked_rooms) != 2:
-        return False, f"Found {len(chest_locked_rooms)} locked chest rooms, need exactly 2"
-    
-    # STRICT: All special rooms (except spawn) must have exactly 1 connection (dead ends)
-    connection_violations = []
-    for room in rooms:
-        connection_count = len(room.connections) if hasattr(room, 'connections') else 0
-        
-        # Special rooms (boss, shop, chests) must have exactly 1 connection
-        if room.room_type in ["boss", "shop", "chest_unlocked", "chest_locked"]:
-            if connection_count != 1:
-                connection_violations.append(f"{room.room_type} has {connection_count} connections, must have exactly 1 (dead end)")
-        
-        # Spawn room can have multiple connections
-        elif room.room_type == "spawn":
-            if connection_count == 0:
-                connection_violations.append(f"spawn has {connection_count} connections, must have at least 1")
-    
-    if connection_violations:
-        return False, f"Dead end violations: {'; '.join(connection_violations)}"
-    
-    # Check spawn connections (only unlocked chests should connect directly to spawn)
-    spawn_room = spawn_rooms[0]
-    invalid_spawn_connections = []
-    if hasattr(spawn_room, 'connections'):
-        for connected_room in spawn_room.connections:
-            if connected_room.room_type != "chest_unlocked" and connected_room.room_type != "normal":
-                invalid_spawn_connections.append(connected_room.room_type)
-    
-    if invalid_spawn_connections:
-        return False, f"Invalid direct connections to spawn: {invalid_spawn_connections}"
-    
-    # CRITICAL: Check actual tilemap connectivity using BFS
-    spawn_center_x = (spawn_room.rect.x // TILE_SIZE) + 6  # Center of 14x14 room (offset 6)
-    spawn_center_y = (spawn_room.rect.y // TILE_SIZE) + 6
-    
-    # BFS to find all reachable tiles
-    visited = set()
-    queue = [(spawn_center_x, spawn_center_y)]
-    visited.add((spawn_center_x, spawn_center_y))
-    
-    directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-    
-    while queue:
-        current_x, current_y = queue.pop(0)
-        
-        for dx, dy in directions:
-            next_x = current_x + dx
-            next_y = current_y + dy
-            
-            if (0 <= next_x < GRID_WIDTH and 0 <= next_y < GRID_HEIGHT and
-                (next_x, next_y) not in visited and
-                tilemap[next_y][next_x] in [0, 2]):  # Floor or door
-                
-                visited.add((next_x, next_y))
-                queue.append((next_x, next_y))
-    
-    # Check if all rooms are reachable via tilemap
-    unreachable_rooms = []
-    unreachable_types = []
-    
-    for room in rooms:
-        if room.room_type == "spawn":
-            continue  # Skip spawn room
-        
-        # Check if ANY floor tile in the room is reachable (not just center, which may have items)
-        room_floor_x = room.rect.x // TILE_SIZE
-        room_floor_y = room.rect.y // TILE_SIZE
-        
-        room_reachable = False
-        for dy in range(14):  # 14x14 room floor
-            for dx in range(14):
-                check_x = room_floor_x + dx
-                check_y = room_floor_y + dy
-                if (check_x, check_y) in visited and tilemap[check_y][check_x] == 0:  # Floor tile that's reachable
-                    room_reachable = True
-                    break
-            if room_reachable:
-                break
-        
-        if not room_reachable:
-            unreachable_rooms.append(room)
-            unreachable_types.append(room.room_type)
-    
-    if unreachable_rooms:
-        return False, f"Map connectivity failed: {len(unreachable_rooms)} rooms unreachable from spawn via floor tiles. Unreachable types: {unreachable_types}"
-    
-    print(f"✅ Tilemap connectivity validated: All {len(rooms)} rooms reachable from spawn")
-    return True, "World is valid"
-
-def generate_valid_world():
-    """Generate worlds until we find a valid one - keep trying until success"""
-    attempt = 0
-    
-    while True:
-        attempt += 1
-        print(f"🌍 Generating world attempt {attempt}...")
-        
-        # Create fresh tilemap for this attempt
-        fresh_tilemap = [[1 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-        
-        try:
-            # Generate rooms
-            rooms = generate_rooms(ROOM_AMT, WORLD_WIDTH, WORLD_HEIGHT, TILE_SIZE, fresh_tilemap)
-            
-            if not rooms:
-                print(f"❌ Attempt {attempt}: Room generation failed")
-                continue
-            
-            # Connect rooms
-            hallways = connect_rooms(rooms, TILE_SIZE, fresh_tilemap)
-            
-            # Validate the world
-            is_valid, message = validate_world(rooms, fresh_tilemap)
-            
-            if is_valid:
-                print(f"✅ Attempt {attempt}: Valid world generated! {message}")
-                # Copy the successful tilemap to the global tilemap
-                for y in range(len(tilemap)):
-                    for x in range(len(tilemap[0])):
-                        tilemap[y][x] = fresh_tilemap[y][x]
-                return rooms, hallways
-            else:
-                print(f"❌ Attempt {attempt}: Invalid world - {message}")
-                
-        except Exception as e:
-            print(f"❌ Attempt {attempt}: Generation failed with error - {e}")
-        
-        # Add a reasonable safety check to prevent infinite loops
-        if attempt >= 100:
-            print(f"🚫 Stopping after {attempt} attempts to prevent infinite loop")
-            return None, None
-
-def main():
-    global room_discovered
-    
-    # Generate a valid world - keep trying until we get one
-    rooms, hallways = generate_valid_world()
-    
-    if not rooms:
+def main(seed=None, headless_steps=None, headless_input=None):
+    """Run the game in the world for a seed (random if None), or with headless_steps
+    just that many simulation steps without a window, drawing or keyboard
+
+    headless_input(player) gives the player's movement direction for each headless step
+    (standing still by default). Returns True when the player died and the next run should start."""
+    global room_discovered, world_executor, world_pool
+
+    # World generation workers start before SDL is initialised, forking after that isn't safe
+    # (headless runs have no next runs to pre-generate worlds for)
+    headless = headless_steps is not None
+    if world_executor is None and (PARALLEL_WORLD_GEN or (PREGENERATED_WORLDS and not headless)):
+        world_executor = start_pool()
+    if screen is None and not headless:
+        init_display()
+    
+    # Take a pre-generated world when any seed will do
+    world_config = WorldConfig(WORLD_WIDTH, WORLD_HEIGHT, TILE_SIZE, ROOM_AMT)
+    world = None
+    if seed is None and world_pool is not None:
+        world = world_pool.pop()
+
+    # Otherwise generate a valid world now - the seed alone decides which one
+    if world is None:
+        if seed is None:
+            seed = random.randrange(1 << 32)
+        if PARALLEL_WORLD_GEN:
+            description = generate_world_parallel(seed, world_config, world_executor)
+            world = description.to_world() if description is not None else None
+        else:
+            world = generate_world(seed, world_config)
+    
+    if world is None:
         print("🚫 CRITICAL ERROR: Failed to generate a valid world after many attempts!")
         print("This should be extremely rare. Please try running again.")
         return
+    print(f"🌱 World seed: {world.seed}")
+
+    # Only now that this run's world exists, start making the next runs' worlds in the background
+    if world_pool is None and PREGENERATED_WORLDS and not headless:
+        world_pool = WorldPool(world_config, world_executor, size=PREGENERATED_WORLDS)
+    opened_chests.clear()
+
+    # Swap the generated tilemap into the global tilemap (O(1) buffer swap)
+    tilemap.swap(world.tilemap)
+    rooms, hallways = world.rooms, world.hallways
 
     print(f"🎉 Final result: {len(rooms)} rooms, {len(hallways) if hallways else 0} hallway segments")
     
@@ -502,20 +344,34 @@ def main():
             room_discovered[i] = True
             break
 
-    # Create Wall sprites based on wall tiles and chest tiles (both block movement)
-    walls = pygame.sprite.Group()
-    for y, row in enumerate(tilemap):
-        for x, tile in enumerate(row):
-            if tile == 1:  # Walls (type 1)
-                wall = Wall(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE)
-                walls.add(wall)
-            elif tile == 3 or tile == 4:  # Both unlocked (3) and locked (4) chests block movement
-                wall = Wall(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE)
-                walls.add(wall)
-
-    # Create spatial grid for optimized collision detection
-    wall_spatial_grid = SpatialGrid(cell_size=TILE_SIZE * 2)  # Each cell is 2x2 tiles
-    wall_spatial_grid.build_from_sprite_group(walls)
+    # Collide directly against wall and chest tiles (opened chests keep blocking movement)
+    collider = TileCollider(tilemap, TILE_SIZE, solid_tiles=(WALL, CHEST_UNLOCKED, CHEST_LOCKED, CHEST_OPENED))
+
+    # Precompute which room owns each tile so per-tile room lookups are O(1)
+    room_index = RoomIndex(rooms, GRID_WIDTH, GRID_HEIGHT, TILE_SIZE)
+
+    # Cross-room paths (room route + cached door-to-door segments) for enemies that walk between rooms
+    room_graph = RoomGraph(rooms, room_index, tilemap, collider)
+
+    # Fog-of-war state, updated only when the player changes area
+    visibility = Visibility(tilemap, room_index)
+
+    # Walls that border open tiles - the only walls that are ever drawn
+    wall_mask = WallEdgeMask(tilemap)
+
+    # Bake the static tile layer in chunks so the renderer blits a handful of surfaces per frame
+    tile_layer = ChunkedTileLayer(
+        tilemap, TILE_SIZE,
+        tile_colors={FLOOR: FLOOR_COLOR, WALL: WALL_COLOR, DOOR: DOOR_COLOR, CHEST_UNLOCKED: CHEST_COLOR,
+                     CHEST_LOCKED: LOCKED_CHEST_COLOR, HOLE: HOLE_COLOR, CHEST_OPENED: OPENED_CHEST_COLOR},
+        background_color=WALL_COLOR,
+        room_index=room_index,
+        room_floor_colors={"shop": SHOP_COLOR, "boss": BOSS_COLOR},
+        wall_mask=wall_mask
+    )
+
+    # Fog overlay baked per chunk from the visibility state, rebuilt only where it changes
+    fog_layer = FogOverlayLayer(tilemap, TILE_SIZE, visibility, room_index, room_discovered, fog_alpha=180)
 
     # Create Player - spawn in spawn room
     spawn_room = None
@@ -531,95 +387,60 @@ def main():
     spawn_x, spawn_y = spawn_room.center
     spawn_x -= TILE_SIZE // 2
     spawn_y -= TILE_SIZE // 2
-    player = Player(spawn_x, spawn_y, walls)
-
-    # Spawn enemies in rooms (excluding spawn room and chest rooms)
-    enemies = spawn_enemies_in_rooms(rooms, walls, TILE_SIZE)
-    
-    # Create bullet group
-    bullets = pygame.sprite.Group()
-
-    running = True
-    while running:
-        clock.tick(FPS)
-        camera.move_to(player.rect)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_e:  # E key for chest interaction
-                    chest_info = find_chest_center_near_player(player.rect, tilemap, TILE_SIZE, INTERACTION_DISTANCE)
-                    if chest_info:
-                        success, message = open_chest(chest_info, tilemap, opened_chests)
-                        if success:
-                            print(f"💰 {message}")
-                        else:
-                            print(f"❌ {message}")
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Left mouse button
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
-                    bullet = player.shoot(mouse_x, mouse_y, camera)
-                    if bullet:
-                        bullets.add(bullet)
-
+    # Game time for every cooldown and timer, advanced by the simulation steps
+    game_clock = GameClock()
+    player = Player(spawn_x, spawn_y, collider, game_clock)
+
+    # Plan enemies per room (excluding spawn room and chest rooms), created when each room is discovered
+    room_spawns = world.room_spawns
+    # Chasing enemies path around walls with a flow field toward the player's tile, and take the
+    # room graph's route from rooms the field doesn't reach
+    flow_field = FlowField(room_index, collider)
+    enemies = EnemyBatch(cell_size=TILE_SIZE * 2, rng=world.ai_rng(), flow_field=flow_field,
+                         room_graph=room_graph, clock=game_clock)
+
+    # Enemy simulation tiers: full rate in the player's room and in view, round-robin in nearby rooms,
+    # asleep in undiscovered ones (the round-robin share stops after 1ms a step, unbudgeted headless
+    # so those runs don't depend on how fast the machine is)
+    enemy_scheduler = LodScheduler(enemies, room_index, room_discovered,
+                                   near_distance=(SCREEN_WIDTH + SCREEN_HEIGHT) // 2,
+                                   budget_ms=None if headless else 1.0)
+    
+    # Pooled projectiles, stepped and drawn in bulk
+    projectiles = ProjectileSystem(collider, cell_size=TILE_SIZE * 2)
+
+    # HUD layer (health bar, HP text, FPS and crosshair), rebuilt only when its values change
+    hud = HudLayer()
+
+    # The game advances in fixed SIM_DT steps of simulated time, however often frames are drawn
+    def step(direction):
+        """Advance the game by one fixed step, the player moving along direction"""
         # Update sprites individually to handle different update signatures
-        player.update()
-        
-        # Update bullets - remove bullets that are far off-screen to improve performance
-        bullets_to_update = []
-        for bullet in bullets:
-            # Calculate distance from camera center
-            camera_center_x = camera.rect.centerx
-            camera_center_y = camera.rect.centery
-            bullet_center_x = bullet.rect.centerx
-            bullet_center_y = bullet.rect.centery
-            
-            # Only update bullets within a reasonable distance from camera
-            # Use Manhattan distance for speed (no sqrt needed)
-            distance = abs(camera_center_x - bullet_center_x) + abs(camera_center_y - bullet_center_y)
-            max_update_distance = SCREEN_WIDTH + SCREEN_HEIGHT  # Bullets within 2 screen distances
-            
-            if distance <= max_update_distance:
-                bullets_to_update.append(bullet)
-            else:
-                # Remove bullets that are too far away
-                bullet.kill()
-        
-        # Update remaining bullets
-        for bullet in bullets_to_update:
-            bullet.update()
-        
-        # Check bullet-enemy collisions
-        for bullet in bullets:
-            hit_enemy = bullet.check_enemy_collision(enemies)
-            if hit_enemy:
-                if hit_enemy.take_damage(bullet.damage):
-                    enemies.remove(hit_enemy)
-        
-        # Update enemies with player reference for AI - only update enemies near the camera
-        camera_center_x = camera.rect.centerx
-        camera_center_y = camera.rect.centery
-        max_enemy_update_distance = SCREEN_WIDTH + SCREEN_HEIGHT  # Update enemies within 2 screen distances
+        enemies.save_positions()
+        player.update(SIM_DT, direction)
+        camera.move_to(player.rect)
         
-        for enemy in enemies:
-            # Calculate distance from camera center
-            enemy_center_x = enemy.rect.centerx
-            enemy_center_y = enemy.rect.centery
-            distance = abs(camera_center_x - enemy_center_x) + abs(camera_center_y - enemy_center_y)
-            
-            # Only update enemies that are reasonably close to the camera
-            if distance <= max_enemy_update_distance:
-                # Set the spatial grid reference for optimized collision detection
-                enemy.wall_spatial_grid = wall_spatial_grid
-                enemy.update(player)
-
-        # Check if player stepped on a hole tile
+        # Step every bullet at once (bullets more than 2 screen distances from the camera are dropped)
+        # and resolve the enemy hits found by the broadphase
+        for slot, hit_enemy in projectiles.step(SIM_DT, enemies, camera.rect.center, SCREEN_WIDTH + SCREEN_HEIGHT):
+            if not hit_enemy.alive():
+                continue  # Killed by an earlier bullet this step, this one flies on
+            projectiles.kill(slot)
+            if hit_enemy.take_damage(int(projectiles.damage[slot])):
+                hit_enemy.kill()
+        
+        # Update enemy AI for this step's LOD tiers (the flow field only rebuilds when the player changes tile)
+        flow_field.update(*player.rect.center)
+        enemy_scheduler.update(player, camera.rect, SIM_DT)
+        game_clock.advance(SIM_DT)
+
+        # Check if player stepped on a hole tile (headless runs stay in the world, the hole scene
+        # needs the window and keyboard)
         player_grid_x = player.rect.centerx // TILE_SIZE
         player_grid_y = player.rect.centery // TILE_SIZE
         
-        if (0 <= player_grid_x < GRID_WIDTH and 0 <= player_grid_y < GRID_HEIGHT and 
-            tilemap[player_grid_y][player_grid_x] == 5):  # Hole tile
+        if (not headless and 0 <= player_grid_x < GRID_WIDTH and 0 <= player_grid_y < GRID_HEIGHT and
+            tilemap[player_grid_y][player_grid_x] == HOLE):
             # Save player stats
             player_stats = {
                 'health': player.health,
@@ -631,128 +452,77 @@ def main():
 
         # Determine current room or if in hallway
         current_room = None
-        player_grid_x = player.rect.centerx // TILE_SIZE
-        player_grid_y = player.rect.centery // TILE_SIZE
         in_hallway = False
         
         # Check if player is in a room and discover it
-        for i, room in enumerate(rooms):
-            if room.rect.collidepoint(player.rect.center):
-                current_room = room
-                if not room_discovered[i]:  # Only print when first discovered
-                    room_discovered[i] = True  # Discover the room when entering
-                    if room.room_type != "normal":  # Only print special rooms
-                        print(f"🎉 DISCOVERED {room.room_type.upper()} ROOM at grid ({room.rect.x//TILE_SIZE}, {room.rect.y//TILE_SIZE})!")
-                    else:
-                        print(f"Discovered normal room {i}")
+        current_room_index = room_index.room_at_point(*player.rect.center)
+        if current_room_index != -1:
+            current_room = rooms[current_room_index]
+            if not room_discovered[current_room_index]:  # Only print when first discovered
+                room_discovered[current_room_index] = True  # Discover the room when entering
+                materialise_room(current_room_index, room_spawns, enemies, collider)
+                visibility.mark_dirty(current_room.rect.x // TILE_SIZE - 1, current_room.rect.y // TILE_SIZE - 1,
+                                      current_room.rect.width // TILE_SIZE + 2, current_room.rect.height // TILE_SIZE + 2)
+                if current_room.room_type != "normal":  # Only print special rooms
+                    print(f"🎉 DISCOVERED {current_room.room_type.upper()} ROOM at grid ({current_room.rect.x//TILE_SIZE}, {current_room.rect.y//TILE_SIZE})!")
                 else:
-                    room_discovered[i] = True
-                break
+                    print(f"Discovered normal room {current_room_index}")
         
         # If not in a room, check if in a hallway (floor tile that's not in any room)
         if not current_room:
             if (0 <= player_grid_x < GRID_WIDTH and 0 <= player_grid_y < GRID_HEIGHT and 
-                tilemap[player_grid_y][player_grid_x] in [0, 3, 4, 5]):  # On floor, unlocked chest, locked chest, or hole
+                tilemap[player_grid_y][player_grid_x] in (FLOOR, CHEST_UNLOCKED, CHEST_LOCKED, HOLE)):
                 in_hallway = True
 
-        # Reset fogmap (for current visibility)
-        fogmap = [[False for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-
-        # Light up current area (only if room is discovered)
-        if current_room:
-            # Find the room index to check if it's discovered
-            current_room_index = None
-            for i, room in enumerate(rooms):
-                if room == current_room:
-                    current_room_index = i
-                    break
-            
-            # Only light up if the room is discovered
-            if current_room_index is not None and room_discovered[current_room_index]:
-                # Light up the entire current room
-                for y in range(current_room.rect.top // TILE_SIZE, current_room.rect.bottom // TILE_SIZE):
-                    for x in range(current_room.rect.left // TILE_SIZE, current_room.rect.right // TILE_SIZE):
-                        if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
-                            fogmap[y][x] = True
-                            exploredmap[y][x] = True
-                
-                # Also light up doors connected to this room
-                room_left = current_room.rect.left // TILE_SIZE - 1
-                room_right = current_room.rect.right // TILE_SIZE
-                room_top = current_room.rect.top // TILE_SIZE - 1
-                room_bottom = current_room.rect.bottom // TILE_SIZE
-                
-                # Check all potential door positions around the room
-                for y in range(room_top, room_bottom + 1):
-                    for x in range(room_left, room_right + 1):
-                        if (0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT and 
-                            tilemap[y][x] == 2):  # Door tile
-                            # Check if this door is on the room's perimeter
-                            on_left_wall = (x == room_left and room_top <= y <= room_bottom)
-                            on_right_wall = (x == room_right and room_top <= y <= room_bottom)
-                            on_top_wall = (y == room_top and room_left <= x <= room_right)
-                            on_bottom_wall = (y == room_bottom and room_left <= x <= room_right)
-                            
-                            if on_left_wall or on_right_wall or on_top_wall or on_bottom_wall:
-                                fogmap[y][x] = True
-                                exploredmap[y][x] = True
+        # Light up the current area - fog state only changes when the player enters a different room or hallway
+        if current_room and room_discovered[current_room_index]:
+            visibility.show_room(current_room_index)
         elif in_hallway:
             # Reveal entire connected hallway system when entering, like rooms
-            # Check if this hallway network is already cached
-            hallway_key = (player_grid_x, player_grid_y)
-            
-            # Check if we already know which network this position belongs to
-            network_tiles = None
-            for cached_tiles in hallway_networks.values():
-                if (player_grid_x, player_grid_y) in cached_tiles:
-                    network_tiles = cached_tiles
-                    break
-            
-            if network_tiles is None:
-                # Discover new hallway network using flood-fill
-                def discover_hallway_network(start_x, start_y):
-                    """Flood-fill to discover all connected hallway tiles"""
-                    stack = [(start_x, start_y)]
-                    visited = set()
-                    network = set()
-                    
-                    while stack:
-                        x, y = stack.pop()
-                        
-                        if (x, y) in visited:
-                            continue
-                        if not (0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT):
-                            continue
-                        if tilemap[y][x] == 1:  # Wall - stop here
-                            continue
-                        
-                        # Check if this tile is inside any room
-                        in_any_room = False
-                        for room in rooms:
-                            if (room.rect.left // TILE_SIZE <= x < room.rect.right // TILE_SIZE and
-                                room.rect.top // TILE_SIZE <= y < room.rect.bottom // TILE_SIZE):
-                                in_any_room = True
-                                break
-                        
-                        # Only include if it's a hallway tile (floor/door not in any room)
-                        if not in_any_room and tilemap[y][x] in [0, 2]:  # Floor or door
-                            visited.add((x, y))
-                            network.add((x, y))
-                            
-                            # Add adjacent tiles to stack
-                            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                                stack.append((x + dx, y + dy))
-                    
-                    return network
-                
-                # Discover and cache the network
-                network_tiles = discover_hallway_network(player_grid_x, player_grid_y)
-                hallway_networks[hallway_key] = network_tiles
-            
-            # Reveal all tiles in the network
-            for x, y in network_tiles:
-                fogmap[y][x] = True
-                exploredmap[y][x] = True
+            visibility.show_hallway(player_grid_x, player_grid_y)
+        else:
+            visibility.hide()
+
+    def render(alpha):
+        """Draw one frame, with moving things alpha of the way from their previous to their current step"""
+        # The camera follows where the player is drawn, not where the last step left it
+        player_rect = player.render_rect(alpha)
+        camera.move_to(player_rect)
+
+        # Pick up fog changes (rebuilds the affected fog chunks on the next draw)
+        fog_dirty_rects = fog_layer.update()
+
+        # Nearby chest for the interaction outline
+        chest_info = find_chest_center_near_player(player.rect, tilemap, TILE_SIZE, INTERACTION_DISTANCE)
+
+        # Enemies on screen, at their interpolated positions
+        visible_enemies = [(enemy, enemies.render_rect(enemy, alpha)) for enemy in enemies.query(camera.rect)]
+
+        if DIRTY_RECT_UPDATES:
+            # Collect what changed on screen since the last frame; skip the frame entirely if nothing did
+            dirty_rects.begin_frame(camera.rect.topleft)
+            for x, y, w, h in fog_dirty_rects:
+                dirty_rects.add((x * TILE_SIZE - camera.rect.x, y * TILE_SIZE - camera.rect.y, w * TILE_SIZE, h * TILE_SIZE))
+            dirty_rects.track("player", player_rect.move(-camera.rect.x, -camera.rect.y))
+            for slot, screen_x, screen_y in zip(*projectiles.screen_positions(camera.rect, alpha)):
+                dirty_rects.track(("projectile", slot), (screen_x, screen_y, projectiles.size, projectiles.size))
+            for enemy, enemy_rect in visible_enemies:
+                # Include the health bar drawn above the enemy, which changes with its health
+                enemy_screen_rect = enemy_rect.move(-camera.rect.x, -camera.rect.y)
+                dirty_rects.track(enemy, enemy_screen_rect.union(enemy_screen_rect.move(0, -8)),
+                                  (enemy.health, id(enemy.image)))
+            if chest_info:
+                dirty_rects.track("chest_outline", (chest_info['top_left_x'] * TILE_SIZE - camera.rect.x - 2,
+                                                    chest_info['top_left_y'] * TILE_SIZE - camera.rect.y - 2,
+                                                    TILE_SIZE * 2 + 4, TILE_SIZE * 2 + 4))
+            dirty_rects.track("crosshair", hud.crosshair_rect(pygame.mouse.get_pos()))
+            if hud.update(player, clock.get_fps()):
+                dirty_rects.add(hud.rect)
+            dirty_rects.end_tracking()
+
+            if not dirty_rects.needs_redraw():
+                return
+            screen.set_clip(dirty_rects.clip_rect())
 
         # Draw
         screen.fill(WALL_COLOR)  # Use wall color so walls appear to extend infinitely
@@ -763,139 +533,11 @@ def main():
         y_start = max(camera.rect.top // TILE_SIZE, 0)
         y_end = min(camera.rect.bottom // TILE_SIZE + 1, GRID_HEIGHT)
 
-        # Draw visible tiles
-        for y in range(y_start, y_end):
-            for x in range(x_start, x_end):
-                # Check if this tile is inside an undiscovered room
-                in_undiscovered_room = False
-                for i, room in enumerate(rooms):
-                    if not room_discovered[i]:
-                        room_grid_left = room.rect.left // TILE_SIZE
-                        room_grid_right = room.rect.right // TILE_SIZE
-                        room_grid_top = room.rect.top // TILE_SIZE
-                        room_grid_bottom = room.rect.bottom // TILE_SIZE
-                        
-                        if (room_grid_left <= x < room_grid_right and 
-                            room_grid_top <= y < room_grid_bottom):
-                            in_undiscovered_room = True
-                            break
-                
-                # If in undiscovered room, draw black (complete fog)
-                if in_undiscovered_room:
-                    screen_x = x * TILE_SIZE - camera.rect.x
-                    screen_y = y * TILE_SIZE - camera.rect.y
-                    pygame.draw.rect(screen, BLACK, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-                    continue
-                
-                # Normal tile rendering for discovered areas
-                if tilemap[y][x] == 1:
-                    # Only render walls that are adjacent to non-wall tiles (visible edges)
-                    is_visible_wall = False
-                    for dy in [-1, 0, 1]:
-                        for dx in [-1, 0, 1]:
-                            if dx == 0 and dy == 0:
-                                continue
-                            check_x, check_y = x + dx, y + dy
-                            if (0 <= check_x < GRID_WIDTH and 0 <= check_y < GRID_HEIGHT and
-                                tilemap[check_y][check_x] != 1):  # Adjacent to non-wall
-                                is_visible_wall = True
-                                break
-                        if is_visible_wall:
-                            break
-                    
-                    if is_visible_wall:
-                        color = WALL_COLOR
-                        screen_x = x * TILE_SIZE - camera.rect.x
-                        screen_y = y * TILE_SIZE - camera.rect.y
-                        pygame.draw.rect(screen, color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-                elif tilemap[y][x] == 2:
-                    color = DOOR_COLOR
-                    screen_x = x * TILE_SIZE - camera.rect.x
-                    screen_y = y * TILE_SIZE - camera.rect.y
-                    pygame.draw.rect(screen, color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-                elif tilemap[y][x] == 3:
-                    color = CHEST_COLOR  # Unlocked chest
-                    screen_x = x * TILE_SIZE - camera.rect.x
-                    screen_y = y * TILE_SIZE - camera.rect.y
-                    pygame.draw.rect(screen, color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-                elif tilemap[y][x] == 4:
-                    color = LOCKED_CHEST_COLOR  # Locked chest
-                    screen_x = x * TILE_SIZE - camera.rect.x
-                    screen_y = y * TILE_SIZE - camera.rect.y
-                    pygame.draw.rect(screen, color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-                elif tilemap[y][x] == 5:
-                    color = HOLE_COLOR  # Hole tile
-                    screen_x = x * TILE_SIZE - camera.rect.x
-                    screen_y = y * TILE_SIZE - camera.rect.y
-                    pygame.draw.rect(screen, color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-                elif tilemap[y][x] == 6:
-                    color = OPENED_CHEST_COLOR  # Opened chest
-                    screen_x = x * TILE_SIZE - camera.rect.x
-                    screen_y = y * TILE_SIZE - camera.rect.y
-                    pygame.draw.rect(screen, color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-                else:
-                    # Check if this floor tile is in a shop room or boss room
-                    in_shop_room = False
-                    in_boss_room = False
-                    for room in rooms:
-                        if (room.rect.left // TILE_SIZE <= x < room.rect.right // TILE_SIZE and
-                            room.rect.top // TILE_SIZE <= y < room.rect.bottom // TILE_SIZE):
-                            if room.room_type == "shop":
-                                in_shop_room = True
-                                break
-                            elif room.room_type == "boss":
-                                in_boss_room = True
-                                break
-                    
-                    if in_boss_room:
-                        color = BOSS_COLOR
-                    elif in_shop_room:
-                        color = SHOP_COLOR
-                    else:
-                        color = FLOOR_COLOR
-                    screen_x = x * TILE_SIZE - camera.rect.x
-                    screen_y = y * TILE_SIZE - camera.rect.y
-                    pygame.draw.rect(screen, color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-
-                # Fog overlay - hide floors, doors, chests, and holes that haven't been explored or aren't currently visible
-                # Walls are always visible once explored (no fog on walls) and only visible walls are drawn
-                if tilemap[y][x] in [0, 2, 3, 4, 5, 6]:  # Floors, doors, unlocked chests, locked chests, holes, and opened chests get fog overlay
-                    screen_x = x * TILE_SIZE - camera.rect.x
-                    screen_y = y * TILE_SIZE - camera.rect.y
-                    
-                    if not exploredmap[y][x]:
-                        # Completely black if never explored
-                        pygame.draw.rect(screen, BLACK, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-                    elif not fogmap[y][x]:
-                        # Special handling for doors - show them if connected to any discovered room
-                        if tilemap[y][x] == 2:  # Door tile
-                            door_should_be_visible = False
-                            
-                            # Check if this door is connected to any discovered room
-                            for i, room in enumerate(rooms):
-                                if room_discovered[i]:
-                                    # Get room boundaries including walls
-                                    room_left = room.rect.left // TILE_SIZE - 1
-                                    room_right = room.rect.right // TILE_SIZE
-                                    room_top = room.rect.top // TILE_SIZE - 1
-                                    room_bottom = room.rect.bottom // TILE_SIZE
-                                    
-                                    # Check if door is on any wall of this discovered room
-                                    on_left_wall = (x == room_left and room_top <= y <= room_bottom)
-                                    on_right_wall = (x == room_right and room_top <= y <= room_bottom)
-                                    on_top_wall = (y == room_top and room_left <= x <= room_right)
-                                    on_bottom_wall = (y == room_bottom and room_left <= x <= room_right)
-                                    
-                                    if on_left_wall or on_right_wall or on_top_wall or on_bottom_wall:
-                                        door_should_be_visible = True
-                                        break
-                            
-                            # Only apply fog if door is not connected to any discovered room
-                            if not door_should_be_visible:
-                                screen.blit(fog_tile, (screen_x, screen_y))
-                        else:
-                            # Apply fog overlay for non-door tiles
-                            screen.blit(fog_tile, (screen_x, screen_y))
+        # Draw the baked static tile layer (walls, floors, doors, chests and holes)
+        tile_layer.draw(screen, camera.rect)
+
+        # Overlay fog and undiscovered rooms, one blit per visible chunk
+        fog_layer.draw(screen, camera.rect)
 
         # Debug: Draw room boundaries and door locations
         if True:  # Enabled for debugging
@@ -922,7 +564,7 @@ def main():
                     else:
                         color = (0, 255, 0)    # Green for normal rooms
                         
-                    pygame.draw.rect(screen, color, room_screen_rect, 2)
+                    draw_outline(screen, color, room_screen_rect, 2)
                     
                     # Draw room center
                     center_x = room_screen_rect.centerx - 2
@@ -932,13 +574,12 @@ def main():
             # Highlight door tiles with a border
             for y in range(y_start, y_end):
                 for x in range(x_start, x_end):
-                    if tilemap[y][x] == 2:  # Door tile
+                    if tilemap[y][x] == DOOR:
                         screen_x = x * TILE_SIZE - camera.rect.x
                         screen_y = y * TILE_SIZE - camera.rect.y
-                        pygame.draw.rect(screen, (255, 255, 255), (screen_x-1, screen_y-1, TILE_SIZE+2, TILE_SIZE+2), 2)
+                        draw_outline(screen, (255, 255, 255), (screen_x-1, screen_y-1, TILE_SIZE+2, TILE_SIZE+2), 2)
 
         # Draw interaction outline around nearby chests
-        chest_info = find_chest_center_near_player(player.rect, tilemap, TILE_SIZE, INTERACTION_DISTANCE)
         if chest_info:
             # Calculate screen position for the chest outline (top-left corner of 2x2 chest)
             outline_screen_x = (chest_info['top_left_x'] * TILE_SIZE) - camera.rect.x
@@ -947,25 +588,21 @@ def main():
             # Draw yellow square outline around the 2x2 chest
             outline_rect = pygame.Rect(outline_screen_x - 2, outline_screen_y - 2, 
                                      TILE_SIZE * 2 + 4, TILE_SIZE * 2 + 4)
-            pygame.draw.rect(screen, INTERACTION_RING_COLOR, outline_rect, 3)
+            draw_outline(screen, INTERACTION_RING_COLOR, outline_rect, 3)
 
         # Draw player (only if on screen)
-        player_screen_rect = camera.apply(player)
+        player_screen_rect = player_rect.move(-camera.rect.x, -camera.rect.y)
         if (player_screen_rect.right >= 0 and player_screen_rect.left < SCREEN_WIDTH and
             player_screen_rect.bottom >= 0 and player_screen_rect.top < SCREEN_HEIGHT):
             screen.blit(player.image, player_screen_rect)
         
-        # Draw bullets (only if on screen)
-        for bullet in bullets:
-            bullet_screen_rect = camera.apply(bullet)
-            if (bullet_screen_rect.right >= 0 and bullet_screen_rect.left < SCREEN_WIDTH and
-                bullet_screen_rect.bottom >= 0 and bullet_screen_rect.top < SCREEN_HEIGHT):
-                screen.blit(bullet.image, bullet_screen_rect)
+        # Draw bullets (only those on screen, in one blits call)
+        projectiles.draw(screen, camera.rect, alpha)
         
         # Draw enemies (only if visible in fog, in discovered rooms, AND on screen)
-        for enemy in enemies:
+        for enemy, enemy_rect in visible_enemies:
             # First check if enemy is on screen to avoid unnecessary calculations
-            enemy_screen_rect = camera.apply(enemy)
+            enemy_screen_rect = enemy_rect.move(-camera.rect.x, -camera.rect.y)
             if not (enemy_screen_rect.right >= 0 and enemy_screen_rect.left < SCREEN_WIDTH and
                     enemy_screen_rect.bottom >= 0 and enemy_screen_rect.top < SCREEN_HEIGHT):
                 continue  # Skip enemies that are off-screen
@@ -976,44 +613,84 @@ def main():
             # Check bounds and fog visibility before doing room discovery
             if not (0 <= enemy_grid_x < GRID_WIDTH and 
                     0 <= enemy_grid_y < GRID_HEIGHT and 
-                    fogmap[enemy_grid_y][enemy_grid_x]):
+                    visibility.fog[enemy_grid_y][enemy_grid_x]):
                 continue  # Skip enemies that are out of bounds or in fog
             
-            # Check if enemy is in a discovered room
-            enemy_in_discovered_room = True  # Assume true for hallways
-            for i, room in enumerate(rooms):
-                if room.rect.collidepoint(enemy.rect.center):
-                    enemy_in_discovered_room = room_discovered[i]
-                    break
+            # Check if enemy is in a discovered room (hallways count as discovered)
+            enemy_room_index = room_index.room_at_point(*enemy.rect.center)
+            enemy_in_discovered_room = enemy_room_index == -1 or room_discovered[enemy_room_index]
             
             # Only draw if enemy is in discovered room
             if enemy_in_discovered_room:
                 screen.blit(enemy.image, enemy_screen_rect)
-                enemy.draw_health_bar(screen, camera)
+                enemy.draw_health_bar(screen, camera, enemy_rect)
             
-        # Draw UI
-        player.draw_health_bar(screen, camera)
+        # Draw UI (health bar, FPS and crosshair at mouse position)
+        hud.draw(screen, player, clock.get_fps(), pygame.mouse.get_pos())
+
+        if DIRTY_RECT_UPDATES:
+            screen.set_clip(None)
+            dirty_rects.present()
+        else:
+            pygame.display.flip()
+
+    if headless:
+        # Simulation only - scripted input and no drawing, as fast as the steps run
+        for _ in range(headless_steps):
+            step(headless_input(player) if headless_input is not None else (0, 0))
+        return
 
-        # Calculate and display FPS
-        current_fps = clock.get_fps()
-        fps_text = pygame.font.Font(None, 36).render(f"FPS: {current_fps:.1f}", True, (255, 255, 255))
-        screen.blit(fps_text, (10, 10))
-        
-        # Draw crosshair at mouse position
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        crosshair_size = 10
-        pygame.draw.line(screen, (255, 255, 255), 
-                        (mouse_x - crosshair_size, mouse_y), 
-                        (mouse_x + crosshair_size, mouse_y), 2)
-        pygame.draw.line(screen, (255, 255, 255), 
-                        (mouse_x, mouse_y - crosshair_size), 
-                        (mouse_x, mouse_y + crosshair_size), 2)
+    # Changed screen regions, used when DIRTY_RECT_UPDATES is on
+    dirty_rects = DirtyRectTracker(screen.get_rect())
 
-        pygame.display.flip()
+    accumulator = 0.0  # Real seconds not simulated yet
+    running = True
+    while running:
+        # Real time since the last frame, capped so a stall doesn't turn into a burst of catch-up steps
+        accumulator += min(clock.tick(FPS) / 1000, MAX_FRAME_TIME)
 
+        # Collect worlds finished in the background and start the next ones
+        if world_pool is not None:
+            world_pool.poll()
 
-    pygame.quit()
-    sys.exit()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_e:  # E key for chest interaction
+                    chest_info = find_chest_center_near_player(player.rect, tilemap, TILE_SIZE, INTERACTION_DISTANCE)
+                    if chest_info:
+                        success, message = open_chest(chest_info, tilemap, opened_chests)
+                        if success:
+                            wall_mask.update_tiles(chest_info['top_left_x'], chest_info['top_left_y'], 2, 2)
+                            tile_layer.invalidate_tiles(chest_info['top_left_x'], chest_info['top_left_y'], 2, 2)
+                            room_graph.invalidate_tiles(chest_info['top_left_x'], chest_info['top_left_y'], 2, 2)
+                            dirty_rects.invalidate()
+                            print(f"💰 {message}")
+                        else:
+                            print(f"❌ {message}")
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1:  # Left mouse button
+                    mouse_x, mouse_y = pygame.mouse.get_pos()
+                    player.shoot(mouse_x, mouse_y, camera, projectiles)
+
+        # Run as many fixed steps as real time has covered, then draw between the last two
+        direction = keyboard_direction()
+        while accumulator >= SIM_DT:
+            step(direction)
+            accumulator -= SIM_DT
+
+        # Dying ends the run, the caller starts the next one
+        if player.health <= 0:
+            print("💀 You died - starting a new run")
+            return True
+
+        render(accumulator / SIM_DT)
+
+    quit_game()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Every death starts a new run, in a pre-generated world when one is ready
+    while main():
+        pass
+    quit_game()
\ No newline at end of file
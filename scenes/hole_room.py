@@ -1,4 +1,6 @@
 import pygame
+from utils.tilemap import TileMap, FLOOR, WALL
+from utils.wall_mask import WallEdgeMask
 
 class HoleRoom:
     """A large underground room accessed through holes in boss rooms"""
@@ -14,6 +16,7 @@ class HoleRoom:
         
         # Create tilemap for the hole room
         self.tilemap = self.create_hole_room_tilemap()
+        self.wall_mask = WallEdgeMask(self.tilemap)
         
         # Player spawn position (center of room)
         self.spawn_x = (self.room_width // 2) * tile_size
@@ -21,18 +24,9 @@ class HoleRoom:
     
     def create_hole_room_tilemap(self):
         """Create the tilemap for the hole room - just walls and floor, no exit"""
-        tilemap = []
-        
-        for y in range(self.room_height):
-            row = []
-            for x in range(self.room_width):
-                # Create walls around the perimeter
-                if (x == 0 or x == self.room_width - 1 or 
-                    y == 0 or y == self.room_height - 1):
-                    row.append(1)  # Wall
-                else:
-                    row.append(0)  # Floor
-            tilemap.append(row)
+        # Walls around the perimeter, floor everywhere inside
+        tilemap = TileMap(self.room_width, self.room_height, fill=WALL)
+        tilemap.fill_rect(1, 1, self.room_width - 2, self.room_height - 2, FLOOR)
         
         return tilemap
     
@@ -0,0 +1,76 @@
+"""
+TileCollider movement and raycasts against the tilemap
+"""
+import pygame
+import pytest
+from utils.collision import TileCollider
+from utils.tilemap import TileMap, WALL, CHEST_LOCKED
+
+TILE_SIZE = 40
+
+@pytest.fixture
+def collider():
+    # 10x10 floor room with a wall border and one wall tile at (5, 5)
+    tilemap = TileMap(10, 10)
+    for i in range(10):
+        tilemap[0][i] = tilemap[9][i] = WALL
+        tilemap[i][0] = tilemap[i][9] = WALL
+    tilemap[5][5] = WALL
+    return TileCollider(tilemap, TILE_SIZE, solid_tiles=(WALL, CHEST_LOCKED))
+
+def test_free_move(collider):
+    rect = pygame.Rect(80, 80, 20, 20)
+    assert collider.move(rect, 10, 15) == (False, False)
+    assert rect.topleft == (90, 95)
+
+def test_move_stops_flush_against_wall(collider):
+    rect = pygame.Rect(170, 210, 20, 20)
+    assert collider.move(rect, 25, 0) == (True, False)
+    assert rect.right == 5 * TILE_SIZE
+
+    rect = pygame.Rect(210, 250, 20, 20)
+    assert collider.move(rect, 0, -25) == (False, True)
+    assert rect.top == 6 * TILE_SIZE
+
+def test_move_slides_along_wall(collider):
+    # Blocked horizontally by the border, still free to move vertically
+    rect = pygame.Rect(45, 100, 20, 20)
+    assert collider.move(rect, -10, 10) == (True, False)
+    assert rect.topleft == (40, 110)
+
+def test_outside_map_is_solid(collider):
+    assert collider.is_solid(-1, 3)
+    assert collider.is_solid(3, 10)
+    assert not collider.is_solid(3, 3)
+
+def test_collides(collider):
+    assert collider.collides(pygame.Rect(195, 195, 10, 10))
+    assert not collider.collides(pygame.Rect(160, 160, 40, 40))
+
+def test_raycast_open_segment(collider):
+    assert collider.raycast(60, 60, 150, 170) is None
+
+def test_raycast_returns_entry_point(collider):
+    # Horizontal segment through the wall tile at (5, 5)
+    tile_x, tile_y, hit_x, hit_y = collider.raycast(100, 220, 300, 220)
+    assert (tile_x, tile_y) == (5, 5)
+    assert hit_x == pytest.approx(200)
+    assert hit_y == pytest.approx(220)
+
+    # Diagonal segment entering the same tile through its bottom edge
+    tile_x, tile_y, hit_x, hit_y = collider.raycast(230, 300, 210, 200)
+    assert (tile_x, tile_y) == (5, 5)
+    assert hit_x == pytest.approx(218)
+    assert hit_y == pytest.approx(240)
+
+def test_raycast_long_segment_does_not_skip_walls(collider):
+    # Far longer than a tile, must still stop at the first wall on the way
+    tile_x, tile_y, hit_x, hit_y = collider.raycast(60, 220, 10000, 220)
+    assert (tile_x, tile_y) == (5, 5)
+    assert hit_x == pytest.approx(200)
+
+def test_raycast_starting_inside_a_wall(collider):
+    assert collider.raycast(210, 210, 100, 100) == (5, 5, 210, 210)
+
+def test_raycast_segment_ending_before_wall(collider):
+    assert collider.raycast(100, 220, 199, 220) is None
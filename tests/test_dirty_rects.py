@@ -0,0 +1,61 @@
+"""
+Dirty-rectangle tracking and clipped redraws
+"""
+import pygame
+import pytest
+from utils.dirty_rects import DirtyRectTracker, draw_outline
+
+SIZE = (200, 160)
+
+def draw_scene(surface):
+    """Outlines like the door highlights and chest ring over a background"""
+    surface.fill((100, 100, 100))
+    for x in range(0, 200, 40):
+        draw_outline(surface, (255, 255, 255), (x - 1, 39, 42, 42), 2)
+    draw_outline(surface, (255, 255, 0), (58, 98, 84, 44), 3)
+
+@pytest.mark.parametrize("clip_height", [1, 2, 3, 7, 40])
+def test_clipped_redraw_matches_full_redraw(clip_height):
+    full = pygame.Surface(SIZE)
+    draw_scene(full)
+    expected = pygame.image.tobytes(full, "RGB")
+
+    for clip_x, clip_width in ((0, SIZE[0]), (37, 5), (60, 30)):
+        for clip_y in range(0, SIZE[1]):
+            # Stale contents outside the clip must stay, inside it the redraw must be exact
+            surface = full.copy()
+            surface.fill((255, 0, 0), (clip_x, clip_y, clip_width, clip_height))
+            surface.set_clip((clip_x, clip_y, clip_width, clip_height))
+            draw_scene(surface)
+            surface.set_clip(None)
+            assert pygame.image.tobytes(surface, "RGB") == expected, (clip_x, clip_y, clip_width)
+
+def test_outline_matches_pygame_outline():
+    ours = pygame.Surface(SIZE)
+    theirs = pygame.Surface(SIZE)
+    for width in (1, 2, 3):
+        ours.fill((0, 0, 0))
+        theirs.fill((0, 0, 0))
+        draw_outline(ours, (255, 255, 255), (20, 30, 50, 40), width)
+        pygame.draw.rect(theirs, (255, 255, 255), (20, 30, 50, 40), width)
+        assert pygame.image.tobytes(ours, "RGB") == pygame.image.tobytes(theirs, "RGB")
+
+def test_state_change_dirties_unmoved_object():
+    tracker = DirtyRectTracker((0, 0) + SIZE)
+    for health, dirty in ((3, True), (3, False), (2, True)):
+        tracker.begin_frame((0, 0))
+        tracker.track("enemy", (10, 10, 30, 30), (health, 1))
+        tracker.end_tracking()
+        assert bool(tracker.rects) == dirty
+        tracker.rects = []
+
+def test_moved_object_dirties_old_and_new_rect():
+    tracker = DirtyRectTracker((0, 0) + SIZE)
+    tracker.begin_frame((0, 0))
+    tracker.track("player", (10, 10, 30, 30))
+    tracker.end_tracking()
+    tracker.rects = []
+    tracker.begin_frame((0, 0))
+    tracker.track("player", (20, 10, 30, 30))
+    tracker.end_tracking()
+    assert tracker.rects == [pygame.Rect(20, 10, 30, 30), pygame.Rect(10, 10, 30, 30)]
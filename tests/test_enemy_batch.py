@@ -0,0 +1,65 @@
+"""
+EnemyBatch separation and push-out from the player
+"""
+import numpy as np
+import pygame
+import pytest
+from entities.enemy import Enemy
+from entities.enemy_batch import EnemyBatch
+from utils.collision import TileCollider
+from utils.tilemap import TileMap
+
+TILE_SIZE = 40
+
+class Target:
+    """Stands in for the player, only its rect is used"""
+
+    def __init__(self, x, y):
+        self.rect = pygame.Rect(0, 0, 40, 40)
+        self.rect.center = (x, y)
+
+@pytest.fixture
+def collider():
+    return TileCollider(TileMap(40, 40), TILE_SIZE)
+
+def make_batch(collider, positions):
+    enemies = EnemyBatch(cell_size=TILE_SIZE * 2, rng=np.random.default_rng(0))
+    for x, y in positions:
+        enemies.add(Enemy(x, y, collider))
+    return enemies
+
+def test_push_out_across_grid_cells(collider):
+    # Player on a grid cell corner with enemies stacked on it, so pushes move enemies into
+    # other cells while the player's cells are being walked (this used to raise
+    # "Set changed size during iteration")
+    player = Target(800, 800)
+    positions = [(800 + dx, 800 + dy) for dx in (-12, -4, 4, 12) for dy in (-12, -4, 4, 12)]
+    enemies = make_batch(collider, positions)
+
+    # No updated slots, so only the player pass runs
+    enemies.separate(np.array([], dtype=np.intp), player)
+
+    for enemy in enemies:
+        assert not enemy.rect.colliderect(player.rect)
+        # Arrays and grid follow the rect
+        assert enemies.x[enemy.batch_slot] == enemy.rect.centerx
+        assert enemies.y[enemy.batch_slot] == enemy.rect.centery
+        assert enemy in enemies.query(enemy.rect)
+
+def test_push_out_is_repeatable(collider):
+    player = Target(800, 800)
+    positions = [(790 + 7 * i, 795 + 3 * i) for i in range(6)]
+    results = []
+    for _ in range(2):
+        enemies = make_batch(collider, positions)
+        enemies.separate(np.array([enemy.batch_slot for enemy in enemies]), player)
+        results.append([enemy.rect.center for enemy in sorted(enemies, key=lambda enemy: enemy.batch_slot)])
+    assert results[0] == results[1]
+
+def test_overlapping_pair_ends_up_touching(collider):
+    enemies = make_batch(collider, [(400, 400), (410, 400)])
+    first, second = sorted(enemies, key=lambda enemy: enemy.batch_slot)
+    enemies.separate(np.array([first.batch_slot, second.batch_slot]))
+    assert not first.rect.colliderect(second.rect)
+    assert second.rect.left - first.rect.right == 0
+    assert first.rect.centery == second.rect.centery == 400
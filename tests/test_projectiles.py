@@ -0,0 +1,118 @@
+"""
+ProjectileSystem wall and enemy hit resolution
+"""
+import pygame
+import pytest
+from entities.projectiles import ProjectileSystem
+from utils.collision import TileCollider
+from utils.tilemap import TileMap, WALL
+
+TILE_SIZE = 40
+
+class Target:
+    """Stands in for an enemy, only its rect is used"""
+
+    def __init__(self, x, y, size=30):
+        self.rect = pygame.Rect(x, y, size, size)
+
+class Targets:
+    """Stands in for the enemy batch's grid query"""
+
+    def __init__(self, *targets):
+        self.targets = targets
+
+        self.areas = []
+
+    def query(self, rect):
+        self.areas.append(pygame.Rect(rect))
+        return [target for target in self.targets if target.rect.colliderect(rect)]
+
+@pytest.fixture
+def projectiles():
+    # 20x10 open floor with a wall column at x = 15
+    tilemap = TileMap(20, 10)
+    for y in range(10):
+        tilemap[y][15] = WALL
+    return ProjectileSystem(TileCollider(tilemap, TILE_SIZE), capacity=8, speed=400, max_distance=1000)
+
+def test_moves_along_its_velocity(projectiles):
+    slot = projectiles.spawn(100, 200, 200, 200)
+    assert projectiles.step(0.1) == []
+    assert projectiles.alive[slot]
+    assert projectiles.x[slot] == pytest.approx(140)
+    assert projectiles.y[slot] == pytest.approx(200)
+
+def test_dies_at_wall_impact_point(projectiles):
+    slot = projectiles.spawn(580, 200, 700, 200)
+    projectiles.step(0.1)
+    assert not projectiles.alive[slot]
+    assert projectiles.x[slot] == pytest.approx(600)
+    assert projectiles.impacts == [(15, 5, pytest.approx(600), pytest.approx(200))]
+
+def test_fast_projectile_cannot_skip_a_wall(projectiles):
+    slot = projectiles.spawn(100, 200, 700, 200, speed=8000)
+    projectiles.step(0.1)
+    assert not projectiles.alive[slot]
+    assert projectiles.x[slot] == pytest.approx(600)
+
+def test_dies_out_of_range(projectiles):
+    projectiles.max_distance = 30
+    slot = projectiles.spawn(100, 200, 200, 200)
+    projectiles.step(0.1)
+    assert not projectiles.alive[slot]
+    assert len(projectiles) == 0
+
+def test_hits_enemy_in_its_path(projectiles):
+    target = Target(150, 190)
+    slot = projectiles.spawn(100, 200, 200, 200)
+    assert projectiles.step(0.1, Targets(target)) == []
+    assert projectiles.step(0.1, Targets(target)) == [(slot, target)]
+
+    # Enemy hits are left for the caller to resolve
+    assert projectiles.alive[slot]
+
+def test_swept_hit_through_thin_enemy(projectiles):
+    # Moves 200px in one step, well past the enemy, but its swept box still overlaps it
+    target = Target(300, 195, size=10)
+    slot = projectiles.spawn(100, 200, 500, 200, speed=2000)
+    assert projectiles.step(0.1, Targets(target)) == [(slot, target)]
+
+def test_nearest_enemy_to_start_wins(projectiles):
+    near = Target(140, 190)
+    far = Target(200, 190)
+    slot = projectiles.spawn(100, 200, 300, 200, speed=2000)
+    assert projectiles.step(0.1, Targets(far, near)) == [(slot, near)]
+
+def test_hits_are_in_slot_order(projectiles):
+    upper = Target(150, 90)
+    lower = Target(150, 290)
+    first = projectiles.spawn(100, 300, 200, 300)
+    second = projectiles.spawn(100, 100, 200, 100)
+    projectiles.step(0.1)
+    assert projectiles.step(0.1, Targets(upper, lower)) == [(first, lower), (second, upper)]
+
+def test_spread_out_projectiles_query_only_their_own_area(projectiles):
+    top_left = Target(140, 40)
+    bottom_right = Target(540, 340)
+    first = projectiles.spawn(100, 50, 200, 50)
+    second = projectiles.spawn(500, 350, 600, 350)
+    targets = Targets(top_left, bottom_right)
+    assert projectiles.step(0.1, targets) == [(first, top_left), (second, bottom_right)]
+
+    # One small query per group of projectiles, not one box spanning the map
+    assert len(targets.areas) == 2
+    for area in targets.areas:
+        assert area.width < 100 and area.height < 100
+
+def test_wall_stops_projectile_before_enemy_behind_it(projectiles):
+    target = Target(620, 190)
+    slot = projectiles.spawn(560, 200, 700, 200, speed=1000)
+    assert projectiles.step(0.1, Targets(target)) == []
+    assert not projectiles.alive[slot]
+
+def test_full_pool_refuses_spawns(projectiles):
+    slots = [projectiles.spawn(100, 200, 200, 200) for _ in range(8)]
+    assert None not in slots
+    assert projectiles.spawn(100, 200, 200, 200) is None
+    projectiles.kill(slots[3])
+    assert projectiles.spawn(100, 200, 200, 200) == slots[3]
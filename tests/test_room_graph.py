@@ -0,0 +1,49 @@
+"""
+RoomGraph paths across a generated world
+"""
+import random
+import pytest
+from utils.collision import TileCollider
+from utils.room_graph import RoomGraph, HALLWAY
+from utils.room_index import RoomIndex
+from utils.tilemap import WALL, CHEST_UNLOCKED, CHEST_LOCKED, CHEST_OPENED
+from utils.world_gen import WorldConfig, generate_world
+
+@pytest.fixture(scope="module")
+def world():
+    config = WorldConfig()
+    world = generate_world(42, config)
+    tilemap = world.tilemap
+    collider = TileCollider(tilemap, config.tile_size,
+                            solid_tiles=(WALL, CHEST_UNLOCKED, CHEST_LOCKED, CHEST_OPENED))
+    room_index = RoomIndex(world.rooms, tilemap.width, tilemap.height, config.tile_size)
+    return RoomGraph(world.rooms, room_index, tilemap, collider), room_index, collider
+
+def open_tiles(room_index, collider, in_hallway):
+    return [(x, y) for y in range(room_index.grid_height) for x in range(room_index.grid_width)
+            if not collider.is_solid(x, y) and (room_index.owner[y * room_index.grid_width + x] == HALLWAY) == in_hallway]
+
+def assert_walkable(path, start, goal, collider):
+    assert path[0] == start and path[-1] == goal
+    for (x, y), (next_x, next_y) in zip(path, path[1:]):
+        assert abs(next_x - x) + abs(next_y - y) == 1
+        assert not collider.is_solid(next_x, next_y)
+
+@pytest.mark.parametrize("from_hallway", [False, True])
+def test_paths_to_rooms_are_walkable(world, from_hallway):
+    room_graph, room_index, collider = world
+    rng = random.Random(1)
+    starts = open_tiles(room_index, collider, from_hallway)
+    goals = open_tiles(room_index, collider, False)
+    for _ in range(200):
+        start = rng.choice(starts)
+        goal = rng.choice(goals)
+        path = room_graph.find_path(*start, *goal)
+        assert path is not None
+        assert_walkable(path, start, goal, collider)
+
+def test_no_path_into_a_hallway(world):
+    room_graph, room_index, collider = world
+    start = open_tiles(room_index, collider, False)[0]
+    goal = open_tiles(room_index, collider, True)[0]
+    assert room_graph.find_path(*start, *goal) is None
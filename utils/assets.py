@@ -0,0 +1,67 @@
+"""
+Shared sprite atlas - one display-format surface holding every entity image, sprites reference its regions
+"""
+import pygame
+
+TARGETING_BRIGHTEN = 50  # How much an enemy's color brightens while it targets the player
+
+# Sprite name -> (size, color)
+SPRITES = {
+    "player": ((40, 40), (0, 255, 0)),      # Green square
+    "bullet": ((6, 6), (255, 255, 0)),      # Yellow bullet
+}
+
+ENEMY_COLORS = {
+    "basic": (255, 0, 0),    # Red square
+    "fast": (255, 100, 0),   # Orange square
+    "tank": (150, 0, 0),     # Dark red square
+}
+ENEMY_SIZE = (30, 30)
+
+def brighten(color, amount):
+    return tuple(min(255, c + amount) for c in color)
+
+# Each enemy type gets a normal and a brightened "targeting" image
+for enemy_type, color in ENEMY_COLORS.items():
+    SPRITES[f"enemy_{enemy_type}"] = (ENEMY_SIZE, color)
+    SPRITES[f"enemy_{enemy_type}_targeting"] = (ENEMY_SIZE, brighten(color, TARGETING_BRIGHTEN))
+
+class SpriteAtlas:
+    """All sprites packed in a row on one surface, converted to the display format when there is one"""
+
+    def __init__(self, sprites, padding=1):
+        width = sum(size[0] + padding for size, color in sprites.values())
+        height = max(size[1] for size, color in sprites.values())
+
+        self.surface = pygame.Surface((width, height))
+        self.converted = pygame.display.get_surface() is not None
+        if self.converted:
+            self.surface = self.surface.convert()
+
+        self.images = {}
+        x = 0
+        for name, (size, color) in sprites.items():
+            region = pygame.Rect((x, 0), size)
+            self.surface.fill(color, region)
+            self.images[name] = self.surface.subsurface(region)
+            x += size[0] + padding
+
+    def get(self, name):
+        return self.images[name]
+
+atlas = None
+
+def get_atlas():
+    """Return the shared atlas, building it on first use (and again once a display exists to convert to)"""
+    global atlas
+    if atlas is None or (not atlas.converted and pygame.display.get_surface() is not None):
+        atlas = SpriteAtlas(SPRITES)
+    return atlas
+
+def get_image(name):
+    """Shared image for a sprite - never draw onto it"""
+    return get_atlas().get(name)
+
+def get_enemy_images(enemy_type):
+    """Return the (normal, targeting) images for an enemy type"""
+    return get_image(f"enemy_{enemy_type}"), get_image(f"enemy_{enemy_type}_targeting")
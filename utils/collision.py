@@ -0,0 +1,120 @@
+"""
+Tile-based collision against the tilemap (replaces per-tile Wall sprites)
+"""
+from utils.tilemap import WALL
+
+class TileCollider:
+    def __init__(self, tilemap, tile_size, solid_tiles=(WALL,)):
+        self.tilemap = tilemap
+        self.tile_size = tile_size
+        self.solid_tiles = frozenset(solid_tiles)
+        self.grid_width = len(tilemap[0])
+        self.grid_height = len(tilemap)
+
+    def is_solid(self, x, y):
+        """Check if a tile blocks movement - everything outside the map is solid"""
+        if 0 <= x < self.grid_width and 0 <= y < self.grid_height:
+            return self.tilemap[y][x] in self.solid_tiles
+        return True
+
+    def solid_span(self, rect):
+        """Return (min_x, max_x, min_y, max_y) of the solid tiles under a rect, or None"""
+        tile_size = self.tile_size
+        min_x = max_x = min_y = max_y = None
+
+        for y in range(rect.top // tile_size, (rect.bottom - 1) // tile_size + 1):
+            for x in range(rect.left // tile_size, (rect.right - 1) // tile_size + 1):
+                if self.is_solid(x, y):
+                    if min_x is None:
+                        min_x = max_x = x
+                        min_y = max_y = y
+                    else:
+                        min_x = min(min_x, x)
+                        max_x = max(max_x, x)
+                        min_y = min(min_y, y)
+                        max_y = max(max_y, y)
+
+        if min_x is None:
+            return None
+        return min_x, max_x, min_y, max_y
+
+    def collides(self, rect):
+        """Check if a rect overlaps any solid tile"""
+        tile_size = self.tile_size
+        for y in range(rect.top // tile_size, (rect.bottom - 1) // tile_size + 1):
+            for x in range(rect.left // tile_size, (rect.right - 1) // tile_size + 1):
+                if self.is_solid(x, y):
+                    return True
+        return False
+
+    def raycast(self, start_x, start_y, end_x, end_y):
+        """Walk a segment through the tile grid (DDA), returns (tile_x, tile_y, hit_x, hit_y) of the first solid tile or None"""
+        tile_size = self.tile_size
+        tile_x = int(start_x // tile_size)
+        tile_y = int(start_y // tile_size)
+        if self.is_solid(tile_x, tile_y):
+            return tile_x, tile_y, start_x, start_y
+
+        end_tile_x = int(end_x // tile_size)
+        end_tile_y = int(end_y // tile_size)
+        dx = end_x - start_x
+        dy = end_y - start_y
+
+        # Fraction of the segment to the next vertical/horizontal tile border and between borders
+        if dx > 0:
+            step_x, t_max_x, t_delta_x = 1, ((tile_x + 1) * tile_size - start_x) / dx, tile_size / dx
+        elif dx < 0:
+            step_x, t_max_x, t_delta_x = -1, (tile_x * tile_size - start_x) / dx, -tile_size / dx
+        else:
+            step_x, t_max_x, t_delta_x = 0, float("inf"), float("inf")
+        if dy > 0:
+            step_y, t_max_y, t_delta_y = 1, ((tile_y + 1) * tile_size - start_y) / dy, tile_size / dy
+        elif dy < 0:
+            step_y, t_max_y, t_delta_y = -1, (tile_y * tile_size - start_y) / dy, -tile_size / dy
+        else:
+            step_y, t_max_y, t_delta_y = 0, float("inf"), float("inf")
+
+        while tile_x != end_tile_x or tile_y != end_tile_y:
+            # Cross whichever tile border comes first along the segment
+            if t_max_x < t_max_y:
+                t = t_max_x
+                tile_x += step_x
+                t_max_x += t_delta_x
+            else:
+                t = t_max_y
+                tile_y += step_y
+                t_max_y += t_delta_y
+            if t > 1:
+                break
+            if self.is_solid(tile_x, tile_y):
+                return tile_x, tile_y, start_x + dx * t, start_y + dy * t
+        return None
+
+    def move(self, rect, dx, dy):
+        """Move a rect in place with axis-separated collision, returns (blocked_x, blocked_y)"""
+        tile_size = self.tile_size
+        blocked_x = blocked_y = False
+
+        # Horizontal movement
+        if dx:
+            rect.x += dx
+            span = self.solid_span(rect)
+            if span:
+                if dx > 0:
+                    rect.right = span[0] * tile_size
+                else:
+                    rect.left = (span[1] + 1) * tile_size
+                blocked_x = True
+
+        # Vertical movement
+        if dy:
+            rect.y += dy
+            span = self.solid_span(rect)
+            if span:
+                if dy > 0:
+                    rect.bottom = span[2] * tile_size
+                else:
+                    rect.top = (span[3] + 1) * tile_size
+                blocked_y = True
+
+        return blocked_x, blocked_y
@@ -0,0 +1,78 @@
+"""
+Dirty-rectangle tracking so only the changed parts of the screen are redrawn and pushed to the display
+"""
+import pygame
+
+def draw_outline(surface, color, rect, width):
+    """Draw a rect's outline as four filled edges
+
+    pygame.draw.rect with a width can draw extra rows when the clip rect cuts through the
+    outline, so clipped redraws wouldn't match full ones - filled rects clip exactly."""
+    rect = pygame.Rect(rect)
+    surface.fill(color, (rect.left, rect.top, rect.width, width))
+    surface.fill(color, (rect.left, rect.bottom - width, rect.width, width))
+    surface.fill(color, (rect.left, rect.top + width, width, rect.height - width * 2))
+    surface.fill(color, (rect.right - width, rect.top + width, width, rect.height - width * 2))
+
+class DirtyRectTracker:
+    def __init__(self, screen_rect):
+        self.screen_rect = pygame.Rect(screen_rect)
+        self.camera_pos = None
+        self.full_redraw = True
+        self.rects = []
+        self.previous = {}  # Key -> (screen rect, state) drawn last frame
+        self.current = {}   # Key -> (screen rect, state) being drawn this frame
+
+    def begin_frame(self, camera_pos):
+        """Start collecting dirty rects, a camera scroll forces a full redraw"""
+        if camera_pos != self.camera_pos:
+            self.camera_pos = camera_pos
+            self.full_redraw = True
+        self.current = {}
+
+    def invalidate(self):
+        """Force a full redraw and flip this frame"""
+        self.full_redraw = True
+
+    def add(self, rect):
+        """Mark a screen rect as changed"""
+        rect = self.screen_rect.clip(rect)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def track(self, key, rect, state=None):
+        """Record where a moving object is drawn this frame, and anything else its look depends on"""
+        self.current[key] = (pygame.Rect(rect), state)
+
+    def end_tracking(self):
+        """Turn tracked objects that moved, changed, appeared or disappeared into dirty rects"""
+        for key, drawn in self.current.items():
+            previous = self.previous.pop(key, None)
+            if previous != drawn:
+                self.add(drawn[0])
+                if previous is not None and previous[0] != drawn[0]:
+                    self.add(previous[0])
+
+        # Whatever is left was drawn last frame but not this one
+        for rect, state in self.previous.values():
+            self.add(rect)
+
+        self.previous = self.current
+
+    def needs_redraw(self):
+        return self.full_redraw or bool(self.rects)
+
+    def clip_rect(self):
+        """Area the renderer has to redraw, or None for the whole screen"""
+        if self.full_redraw:
+            return None
+        return self.rects[0].unionall(self.rects[1:])
+
+    def present(self):
+        """Push the frame to the display - a full flip or only the dirty rects"""
+        if self.full_redraw:
+            pygame.display.flip()
+        elif self.rects:
+            pygame.display.update(self.rects)
+        self.full_redraw = False
+        self.rects = []
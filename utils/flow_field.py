@@ -0,0 +1,93 @@
+"""
+Shared flow field toward the player - one BFS per player tile change, O(1) direction lookups for every chaser
+"""
+from collections import deque
+import numpy as np
+
+# Orthogonal steps first so straight paths are preferred over diagonal ones
+NEIGHBOURS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+class FlowField:
+    """For every walkable tile near the target, the tile to step to next on a shortest path to it
+
+    The field only spreads through the target's own room and the hallways, or through
+    anything if the target is standing in a hallway, and stops after max_distance steps."""
+
+    def __init__(self, room_index, collider, max_distance=24):
+        self.room_index = room_index
+        self.collider = collider
+        self.tile_size = collider.tile_size
+        self.width = room_index.grid_width
+        self.height = room_index.grid_height
+        self.max_distance = max_distance
+
+        # Flat tile index -> next tile index toward the target (the target maps to itself), -1 if unreached
+        self.next_tile = np.full(self.width * self.height, -1, dtype=np.int32)
+        self.reached = np.zeros(0, dtype=np.int32)
+        self.target_tile = None
+
+    def update(self, x, y):
+        """Retarget the field at a pixel position, rebuilding it only if that is a different tile"""
+        tile = (int(x) // self.tile_size, int(y) // self.tile_size)
+        if tile == self.target_tile:
+            return False
+        self.target_tile = tile
+        self.rebuild(*tile)
+        return True
+
+    def rebuild(self, target_x, target_y):
+        """Breadth-first search out from the target tile"""
+        self.next_tile[self.reached] = -1
+        self.reached = np.zeros(0, dtype=np.int32)
+
+        width = self.width
+        height = self.height
+        is_solid = self.collider.is_solid
+        owner = self.room_index.owner
+        if is_solid(target_x, target_y):
+            return
+
+        start = target_y * width + target_x
+        target_room = owner[start]
+        came_from = {start: start}
+        frontier = deque([(target_x, target_y, 0)])
+
+        while frontier:
+            x, y, distance = frontier.popleft()
+            if distance >= self.max_distance:
+                continue
+            index = y * width + x
+
+            for dx, dy in NEIGHBOURS:
+                next_x = x + dx
+                next_y = y + dy
+                if not (0 <= next_x < width and 0 <= next_y < height):
+                    continue
+                next_index = next_y * width + next_x
+                if next_index in came_from or is_solid(next_x, next_y):
+                    continue
+                # Don't cut corners past walls on diagonal steps
+                if dx and dy and (is_solid(x + dx, y) or is_solid(x, y + dy)):
+                    continue
+                # From inside a room, only that room and the hallways count
+                if target_room != -1 and owner[next_index] not in (-1, target_room):
+                    continue
+
+                came_from[next_index] = index
+                frontier.append((next_x, next_y, distance + 1))
+
+        self.reached = np.fromiter(came_from.keys(), dtype=np.int32, count=len(came_from))
+        self.next_tile[self.reached] = np.fromiter(came_from.values(), dtype=np.int32, count=len(came_from))
+
+    def next_tiles(self, x, y):
+        """Vectorised lookup for pixel positions, returns (tile index, next tile index or -1) arrays"""
+        tile_x = np.floor_divide(x, self.tile_size).astype(np.intp)
+        tile_y = np.floor_divide(y, self.tile_size).astype(np.intp)
+        inside = (tile_x >= 0) & (tile_x < self.width) & (tile_y >= 0) & (tile_y < self.height)
+        index = np.where(inside, tile_y * self.width + tile_x, 0)
+        return index, np.where(inside, self.next_tile[index], -1)
+
+    def tile_centers(self, index):
+        """Pixel centers of flat tile indices"""
+        return ((index % self.width) * self.tile_size + self.tile_size / 2,
+                (index // self.width) * self.tile_size + self.tile_size / 2)
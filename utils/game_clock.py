@@ -0,0 +1,29 @@
+"""
+Game clocks - where entities read the time for cooldowns and timers
+"""
+import pygame
+
+class GameClock:
+    """Simulated milliseconds, advanced by the simulation steps rather than by wall time
+
+    Everything in one game shares a clock, so a run plays out the same however fast the
+    steps are taken."""
+
+    def __init__(self, start=0):
+        self.time = start
+
+    def advance(self, dt):
+        """Move the clock forward by one step of dt seconds"""
+        self.time += dt * 1000
+
+    def get_ticks(self):
+        """Milliseconds of game time (same units as pygame.time.get_ticks)"""
+        return self.time
+
+class WallClock:
+    """Real milliseconds since pygame.init, for entities used outside a simulation loop"""
+
+    def get_ticks(self):
+        return pygame.time.get_ticks()
+
+WALL_CLOCK = WallClock()
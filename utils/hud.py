@@ -0,0 +1,121 @@
+"""
+Cached text rendering and a HUD layer that is only redrawn when its values change
+"""
+import pygame
+from collections import OrderedDict
+
+WHITE = (255, 255, 255)
+
+class SurfaceCache:
+    """Bounded LRU of rendered surfaces"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+    def get(self, key, build):
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = build()
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+# Fonts are loaded once per size, rendered strings and bars are memoised
+fonts = {}
+text_cache = SurfaceCache(max_entries=256)
+bar_cache = SurfaceCache(max_entries=128)
+
+def get_font(size):
+    """Return the default font at a size, loading it on first use"""
+    font = fonts.get(size)
+    if font is None:
+        font = pygame.font.Font(None, size)
+        fonts[size] = font
+    return font
+
+def render_text(text, size, color=WHITE):
+    """Render a string with the default font, reusing earlier renders of the same string"""
+    return text_cache.get((text, size, color), lambda: get_font(size).render(text, True, color))
+
+def render_bar(width, height, value, max_value, back_color, fill_color, border_color=None, border_width=0):
+    """Render a health-style bar, reusing earlier renders of the same value"""
+    def build():
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill(back_color)
+        pygame.draw.rect(surface, fill_color, (0, 0, width * value / max_value, height))
+        if border_color:
+            pygame.draw.rect(surface, border_color, (0, 0, width, height), border_width)
+        return surface
+
+    return bar_cache.get((width, height, value, max_value, back_color, fill_color, border_color, border_width), build)
+
+class HudLayer:
+    """Player health bar, HP text and FPS composed into one surface, rebuilt only when they change"""
+
+    def __init__(self, width=400, height=40, crosshair_size=10, fps_interval=500):
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.rect = self.surface.get_rect(topleft=(0, 0))
+        self.values = None
+        self.changed = True
+
+        # The FPS readout is a whole number refreshed every fps_interval ms, so it doesn't rebuild the HUD every frame
+        self.fps_interval = fps_interval
+        self.fps_text = None
+        self.fps_time = None
+
+        # Crosshair drawn once, blitted at the mouse position every frame
+        self.crosshair_size = crosshair_size
+        self.crosshair = pygame.Surface((crosshair_size * 2 + 1, crosshair_size * 2 + 1), pygame.SRCALPHA)
+        pygame.draw.line(self.crosshair, WHITE, (0, crosshair_size), (crosshair_size * 2, crosshair_size), 2)
+        pygame.draw.line(self.crosshair, WHITE, (crosshair_size, 0), (crosshair_size, crosshair_size * 2), 2)
+
+    def rebuild(self, health, max_health, fps_text):
+        """Redraw the cached HUD surface"""
+        bar_x = 10
+        bar_y = 10
+        bar_width = 200
+        bar_height = 20
+
+        self.surface.fill((0, 0, 0, 0))
+        self.surface.blit(render_bar(bar_width, bar_height, health, max_health,
+                                     (100, 0, 0), (0, 255, 0), WHITE, 2), (bar_x, bar_y))
+        self.surface.blit(render_text(f"HP: {health}/{max_health}", 24), (bar_x + bar_width + 10, bar_y))
+        if fps_text:
+            self.surface.blit(render_text(fps_text, 36), (10, 10))
+
+    def update(self, player, fps=None):
+        """Rebuild the HUD surface if any of its values changed, returns True if it did"""
+        values = (player.health, player.max_health, self.update_fps_text(fps))
+        self.changed = values != self.values
+        if self.changed:
+            self.values = values
+            self.rebuild(*values)
+        return self.changed
+
+    def update_fps_text(self, fps):
+        """Return the FPS readout, only taking a new reading once per fps_interval"""
+        if fps is None:
+            return None
+        now = pygame.time.get_ticks()
+        if self.fps_time is None or now - self.fps_time >= self.fps_interval:
+            self.fps_text = f"FPS: {round(fps)}"
+            self.fps_time = now
+        return self.fps_text
+
+    def crosshair_rect(self, mouse_pos):
+        """Screen rect covered by the crosshair at a mouse position"""
+        return self.crosshair.get_rect(center=mouse_pos)
+
+    def draw(self, screen, player, fps=None, mouse_pos=None):
+        """Draw the cached HUD and, if given a mouse position, the crosshair"""
+        self.update(player, fps)
+        screen.blit(self.surface, self.rect)
+        if mouse_pos is not None:
+            screen.blit(self.crosshair, self.crosshair_rect(mouse_pos))
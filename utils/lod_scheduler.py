@@ -0,0 +1,107 @@
+"""
+Simulation level-of-detail - which enemies are updated each step, picked per room bucket
+"""
+import time
+import numpy as np
+
+class LodScheduler:
+    """Full rate for the player's room and rooms in view, round-robin for nearby rooms, asleep otherwise
+
+    Enemies in undiscovered or far away rooms are never touched. The round-robin tier stops once
+    the step's time budget is spent, enemies it reaches catch up on the steps they missed.
+    Without a budget (budget_ms=None) the whole share is always done, so runs are repeatable."""
+
+    def __init__(self, enemies, room_index, room_discovered, near_distance,
+                 reduced_interval=4, budget_ms=2.0, chunk_size=8):
+        self.enemies = enemies
+        self.room_index = room_index
+        self.room_discovered = room_discovered
+        self.near_distance = near_distance  # Manhattan distance from the camera that counts as nearby
+        self.reduced_interval = reduced_interval  # Target steps between updates in the round-robin tier
+        self.max_catch_up = reduced_interval * 2  # Steps of movement a late enemy may make up at once
+        self.budget = budget_ms / 1000 if budget_ms is not None else None
+        self.chunk_size = chunk_size
+        self.frame = 0
+        self.cursor = 0
+
+        enemies.bucket_rooms(room_index)
+
+    def is_near(self, rect, camera_rect):
+        """Check if a rect is within the nearby distance of the camera"""
+        dx = max(camera_rect.left - rect.right, rect.left - camera_rect.right, 0)
+        dy = max(camera_rect.top - rect.bottom, rect.top - camera_rect.bottom, 0)
+        return dx + dy <= self.near_distance
+
+    def tiers(self, player, camera_rect):
+        """Return the (full, reduced) slot arrays for this step"""
+        enemies = self.enemies
+        rooms = self.room_index.rooms
+        current_room = self.room_index.room_at_point(*player.rect.center)
+        full = []
+        reduced = []
+
+        for room_id, bucket in enemies.room_buckets.items():
+            if not bucket:
+                continue
+            if room_id == -1:
+                continue  # Hallways are split per enemy below
+            if not self.room_discovered[room_id]:
+                continue  # Asleep until discovered
+
+            room_rect = rooms[room_id].rect
+            if room_id == current_room or room_rect.colliderect(camera_rect):
+                full.extend(bucket)
+            elif self.is_near(room_rect, camera_rect):
+                reduced.extend(bucket)
+
+        full = np.array(full, dtype=np.intp)
+        reduced = np.array(sorted(reduced), dtype=np.intp)
+
+        # Enemies that wandered into hallways: full rate on screen, round-robin nearby
+        hallway = enemies.room_buckets.get(-1)
+        if hallway:
+            slots = np.fromiter(hallway, dtype=np.intp, count=len(hallway))
+            x = enemies.x[slots]
+            y = enemies.y[slots]
+            in_view = ((x >= camera_rect.left) & (x < camera_rect.right) &
+                       (y >= camera_rect.top) & (y < camera_rect.bottom))
+            dx = np.maximum(np.maximum(camera_rect.left - x, x - camera_rect.right), 0)
+            dy = np.maximum(np.maximum(camera_rect.top - y, y - camera_rect.bottom), 0)
+            near = ~in_view & (dx + dy <= self.near_distance)
+            full = np.concatenate((full, slots[in_view]))
+            reduced = np.concatenate((reduced, np.sort(slots[near])))
+
+        return full, reduced
+
+    def update(self, player, camera_rect, dt, now=None):
+        """Update this step's share of enemies, each step being dt seconds"""
+        start = time.perf_counter()
+        enemies = self.enemies
+        self.frame += 1
+        frame = self.frame
+
+        full, reduced = self.tiers(player, camera_rect)
+
+        # Full rate - always updated, one step of movement
+        enemies.update_slots(full, player, dt, now)
+        enemies.last_update_frame[full] = frame
+
+        if not len(reduced):
+            return
+
+        # Round-robin through the nearby tier, about 1/reduced_interval of it per step,
+        # until that share is done or the budget is spent
+        share = -(-len(reduced) // self.reduced_interval)
+        if self.cursor >= len(reduced):
+            self.cursor = 0
+        done = 0
+        while done < share and (self.budget is None or time.perf_counter() - start < self.budget):
+            chunk = reduced[self.cursor:self.cursor + min(self.chunk_size, share - done)]
+            steps = np.minimum(frame - enemies.last_update_frame[chunk], self.max_catch_up)
+            enemies.update_slots(chunk, player, steps * dt, now)
+            enemies.last_update_frame[chunk] = frame
+
+            done += len(chunk)
+            self.cursor += len(chunk)
+            if self.cursor >= len(reduced):
+                self.cursor = 0
@@ -1,28 +1,31 @@
 import random
 import pygame
 from data.room import Room
+from utils.tilemap import FLOOR, WALL, DOOR, CHEST_UNLOCKED, CHEST_LOCKED, HOLE
 
-def generate_rooms(max_rooms, map_width, map_height, tile_size, tilemap):
+def generate_rooms(max_rooms, map_width, map_height, tile_size, tilemap, layout_rng=None, typing_rng=None):
     """Generate rooms using a simple grid-based system"""
-    return generate_grid_rooms(max_rooms, map_width, map_height, tile_size, tilemap)
+    return generate_grid_rooms(max_rooms, map_width, map_height, tile_size, tilemap, layout_rng, typing_rng)
 
-def generate_grid_rooms(max_rooms, map_width, map_height, tile_size, tilemap):
+def generate_grid_rooms(max_rooms, map_width, map_height, tile_size, tilemap, layout_rng=None, typing_rng=None):
     """Generate rooms in a grid pattern with 14x14 floor rooms connected by 2-wide hallways"""
     """Improved algorithm with smarter placement for guaranteed connectivity"""
     
+    # Separate random streams for where rooms go and which rooms get special types (global random by default)
+    layout_rng = layout_rng if layout_rng is not None else random
+    typing_rng = typing_rng if typing_rng is not None else random
+    
     max_attempts = 20
     
     for attempt in range(max_attempts):
         print(f"DEBUG: Layout attempt {attempt + 1}/{max_attempts}")
         
         # Reset tilemap for this attempt
-        for y in range(len(tilemap)):
-            for x in range(len(tilemap[0])):
-                tilemap[y][x] = 1  # Reset to walls
+        tilemap.fill(WALL)
         
         # Calculate grid dimensions
-        grid_width = len(tilemap[0])  # Should be 120 tiles (4800/40)
-        grid_height = len(tilemap)    # Should be 90 tiles (3600/40)
+        grid_width = tilemap.width   # 160 tiles (6400/40)
+        grid_height = tilemap.height  # 130 tiles (5200/40)
         
         # Room settings - one tile larger in each direction again
         room_floor_size = 14  # 14x14 floor tiles (increased from 12x12)
@@ -129,7 +132,7 @@ def generate_grid_rooms(max_rooms, map_width, map_height, tile_size, tilemap):
                 single_connection_candidates = [c for c in adjacent_candidates if c[4] == 1]
                 if single_connection_candidates:
                     # Randomize among single-connection positions
-                    chosen = random.choice(single_connection_candidates)
+                    chosen = layout_rng.choice(single_connection_candidates)
                 else:
                     # If no single connections available, take lowest connection count
                     chosen = min(adjacent_candidates, key=lambda x: x[4])
@@ -160,8 +163,6 @@ def generate_grid_rooms(max_rooms, map_width, map_height, tile_size, tilemap):
                 print("WARNING: Could not find fully connected layout, using last attempt")
     
     # Generate the actual rooms using the selected positions
-    grid_width = len(tilemap[0])
-    grid_height = len(tilemap)
     room_floor_size = 14
     room_wall_thickness = 1
     
@@ -239,7 +240,7 @@ def generate_grid_rooms(max_rooms, map_width, map_height, tile_size, tilemap):
         single_connection_candidates.extend(multi_connection_candidates[:needed])
     
     # Randomly assign special rooms to single-connection positions
-    random.shuffle(single_connection_candidates)
+    typing_rng.shuffle(single_connection_candidates)
     
     # Assign boss room (furthest from spawn if possible)
     boss_idx = single_connection_candidates[0]
@@ -276,13 +277,7 @@ def generate_grid_rooms(max_rooms, map_width, map_height, tile_size, tilemap):
     for room in rooms:
         floor_x = room.rect.x // tile_size
         floor_y = room.rect.y // tile_size
-        
-        for dy in range(room_floor_size):
-            for dx in range(room_floor_size):
-                grid_x = floor_x + dx
-                grid_y = floor_y + dy
-                if 0 <= grid_x < grid_width and 0 <= grid_y < grid_height:
-                    tilemap[grid_y][grid_x] = 0  # Floor
+        tilemap.fill_rect(floor_x, floor_y, room_floor_size, room_floor_size, FLOOR)
     
     # Place special items in rooms based on their types
     place_special_room_items(rooms, tilemap, tile_size)
@@ -362,10 +357,7 @@ def create_l_shaped_hallway(room1, room2, tilemap):
         y = r1_center_y
         
         print(f"        Horizontal segment from x={start_x} to x={end_x} at y={y} (2 tiles wide)")
-        for x in range(start_x, end_x + 1):
-            if 0 <= x < len(tilemap[0]) and 0 <= y < len(tilemap) and 0 <= y + 1 < len(tilemap):
-                tilemap[y][x] = 0      # Floor
-                tilemap[y + 1][x] = 0  # Floor (2 tiles wide)
+        tilemap.fill_rect(start_x, y, end_x - start_x + 1, 2, FLOOR)
         
         # Calculate door1 position at room1 edge
         if dx > 0:  # Moving right from room1
@@ -391,10 +383,7 @@ def create_l_shaped_hallway(room1, room2, tilemap):
         x = r2_center_x
         
         print(f"        Vertical segment from y={start_y} to y={end_y} at x={x} (2 tiles wide)")
-        for y in range(start_y, end_y + 1):
-            if 0 <= x < len(tilemap[0]) and 0 <= x + 1 < len(tilemap[0]) and 0 <= y < len(tilemap):
-                tilemap[y][x] = 0      # Floor
-                tilemap[y][x + 1] = 0  # Floor (2 tiles wide)
+        tilemap.fill_rect(x, start_y, 2, end_y - start_y + 1, FLOOR)
         
         # Calculate door2 position at room2 edge
         if dy > 0:  # Moving down to room2
@@ -413,27 +402,19 @@ def create_l_shaped_hallway(room1, room2, tilemap):
                 door1_x = room1_floor_x + 6   # Center the 2-wide door
                 door1_y = room1_floor_y - 1   # Top edge of room1 floor - 1 (the wall)
     
-    # Place door1 if calculated
+    # Place door1 if calculated (2 tiles stacked vertically)
     if door1_x is not None and door1_y is not None:
-        if 0 <= door1_x < len(tilemap[0]) and 0 <= door1_y < len(tilemap) and 0 <= door1_y + 1 < len(tilemap):
-            tilemap[door1_y][door1_x] = 2      # Door
-            tilemap[door1_y + 1][door1_x] = 2  # Door (2nd door tile)
-            print(f"        Door1 at ({door1_x}, {door1_y})")
+        tilemap.fill_rect(door1_x, door1_y, 1, 2, DOOR)
+        print(f"        Door1 at ({door1_x}, {door1_y})")
     
     # Place door2 if calculated
     if door2_x is not None and door2_y is not None:
-        if 0 <= door2_x < len(tilemap[0]) and 0 <= door2_y < len(tilemap):
-            # For horizontal doors, place 2 tiles vertically; for vertical doors, place 2 tiles horizontally
-            if dy == 0:  # Horizontal connection
-                if 0 <= door2_y + 1 < len(tilemap):
-                    tilemap[door2_y][door2_x] = 2      # Door
-                    tilemap[door2_y + 1][door2_x] = 2  # Door (2nd door tile)
-                    print(f"        Door2 at ({door2_x}, {door2_y})")
-            else:  # Vertical connection
-                if 0 <= door2_x + 1 < len(tilemap[0]):
-                    tilemap[door2_y][door2_x] = 2      # Door
-                    tilemap[door2_y][door2_x + 1] = 2  # Door (2nd door tile)
-                    print(f"        Door2 at ({door2_x}, {door2_y})")
+        # For horizontal doors, place 2 tiles vertically; for vertical doors, place 2 tiles horizontally
+        if dy == 0:  # Horizontal connection
+            tilemap.fill_rect(door2_x, door2_y, 1, 2, DOOR)
+        else:  # Vertical connection
+            tilemap.fill_rect(door2_x, door2_y, 2, 1, DOOR)
+        print(f"        Door2 at ({door2_x}, {door2_y})")
 
 def get_room_grid_pos(room, tile_size):
     """Get the grid position of a room based on its pixel coordinates"""
@@ -442,12 +423,15 @@ def get_room_grid_pos(room, tile_size):
     grid_row = room.rect.y // (spacing * tile_size)
     return grid_col, grid_row
 
-def connect_rooms(rooms, tile_size, tilemap):
+def connect_rooms(rooms, tile_size, tilemap, rng=None):
     """Connect rooms ensuring 100% connectivity using only adjacent connections"""
     """Special rooms (shop, boss, chest) will only have one connection"""
     
     if len(rooms) < 2:
         return []
+    
+    # Random stream for the order rooms are tried in (global random by default)
+    rng = rng if rng is not None else random
 
     hallways = []
     
@@ -475,8 +459,11 @@ def connect_rooms(rooms, tile_size, tilemap):
     
     # PHASE 1: Connect all normal rooms to each other and spawn
     normal_rooms = [room for room in rooms if room.room_type == "normal"]
-    connected_rooms = {spawn_room}
-    unconnected_rooms = set(normal_rooms)
+    # Lists in a shuffled order rather than sets, so which rooms get joined (and so the hallways)
+    # comes from the random stream instead of where the rooms happen to be in memory
+    connected_rooms = [spawn_room]
+    unconnected_rooms = list(normal_rooms)
+    rng.shuffle(unconnected_rooms)
     
     print(f"DEBUG: Phase 1 - Connecting {len(normal_rooms)} normal rooms to spawn")
     
@@ -502,7 +489,7 @@ def connect_rooms(rooms, tile_size, tilemap):
                         hallways.extend(segments)
                         unconnected_room.connections.append(connected_room)
                         connected_room.connections.append(unconnected_room)
-                        connected_rooms.add(unconnected_room)
+                        connected_rooms.append(unconnected_room)
                         unconnected_rooms.remove(unconnected_room)
                         print(f"  Connected {unconnected_room.room_type} to {connected_room.room_type}")
                         connection_made = True
@@ -525,7 +512,9 @@ def connect_rooms(rooms, tile_size, tilemap):
         connected = False
         
         # Find an adjacent connected room to connect to
-        for connected_room in connected_rooms:
+        candidates = list(connected_rooms)
+        rng.shuffle(candidates)
+        for connected_room in candidates:
             # Skip other special rooms for connections
             if connected_room.room_type in ["boss", "shop", "chest_unlocked", "chest_locked"]:
                 continue
@@ -539,7 +528,7 @@ def connect_rooms(rooms, tile_size, tilemap):
                     hallways.extend(segments)
                     special_room.connections.append(connected_room)
                     connected_room.connections.append(special_room)
-                    connected_rooms.add(special_room)
+                    connected_rooms.append(special_room)
                     print(f"  Connected {special_room.room_type} to {connected_room.room_type} (single connection)")
                     connected = True
                     break
@@ -560,8 +549,6 @@ def place_special_room_items(rooms, tilemap, tile_size):
     """Place items in special rooms after all room type assignments are finalized"""
     print(f"DEBUG: Placing special items based on final room types...")
     
-    grid_width = len(tilemap[0])
-    grid_height = len(tilemap)
     room_wall_thickness = 1
     
     for i, room in enumerate(rooms):
@@ -585,18 +572,13 @@ def place_special_room_items(rooms, tilemap, tile_size):
             chest_center_y = floor_y + floor_height // 2
             
             # Use room_type to determine if unlocked or locked
-            chest_tile = 3 if room.room_type == "chest_unlocked" else 4
+            chest_tile = CHEST_UNLOCKED if room.room_type == "chest_unlocked" else CHEST_LOCKED
             chest_type = "unlocked" if room.room_type == "chest_unlocked" else "locked"
             
             print(f"    Placing {chest_type} chest (tile {chest_tile}) at center ({chest_center_x}, {chest_center_y})")
             
             # Place 2x2 chest centered in room
-            for dy in range(2):
-                for dx in range(2):
-                    chest_x = chest_center_x - 1 + dx  # Center the 2x2 chest
-                    chest_y = chest_center_y - 1 + dy
-                    if 0 <= chest_x < grid_width and 0 <= chest_y < grid_height:
-                        tilemap[chest_y][chest_x] = chest_tile
+            tilemap.fill_rect(chest_center_x - 1, chest_center_y - 1, 2, 2, chest_tile)
         
         # Place hole tiles in center of boss rooms (2x2 hole)
         elif room.room_type == "boss":
@@ -606,12 +588,7 @@ def place_special_room_items(rooms, tilemap, tile_size):
             print(f"    Placing boss hole at center ({hole_center_x}, {hole_center_y})")
             
             # Place 2x2 hole centered in room
-            for dy in range(2):
-                for dx in range(2):
-                    hole_x = hole_center_x - 1 + dx  # Center the 2x2 hole
-                    hole_y = hole_center_y - 1 + dy
-                    if 0 <= hole_x < grid_width and 0 <= hole_y < grid_height:
-                        tilemap[hole_y][hole_x] = 5  # Hole tile type
+            tilemap.fill_rect(hole_center_x - 1, hole_center_y - 1, 2, 2, HOLE)
 
 def ensure_all_special_rooms_connected(rooms, room_grid, tilemap):
     """Ensure all special rooms are connected to spawn by relocating them if necessary"""
@@ -1155,10 +1132,7 @@ def create_direct_hallway(room1, room2, tilemap):
             print(f"        Door1 at ({door1_x}, {door1_y}), Door2 at ({door2_x}, {door2_y})")
             
             # Carve 2-wide horizontal hallway that connects the doors
-            for x in range(hallway_start_x, hallway_end_x + 1):
-                if 0 <= x < len(tilemap[0]) and 0 <= hallway_y < len(tilemap) and 0 <= hallway_y + 1 < len(tilemap):
-                    tilemap[hallway_y][x] = 0      # Floor
-                    tilemap[hallway_y + 1][x] = 0  # Floor (2 tiles wide)
+            tilemap.fill_rect(hallway_start_x, hallway_y, hallway_end_x - hallway_start_x + 1, 2, FLOOR)
         else:  # room2 is to the left of room1
             # Calculate door positions at room walls - FIXED: Use floor coordinates
             room1_floor_x = room1.rect.x // 40
@@ -1180,18 +1154,11 @@ def create_direct_hallway(room1, room2, tilemap):
             print(f"        Door1 at ({door1_x}, {door1_y}), Door2 at ({door2_x}, {door2_y})")
             
             # Carve 2-wide horizontal hallway that connects the doors
-            for x in range(hallway_start_x, hallway_end_x + 1):
-                if 0 <= x < len(tilemap[0]) and 0 <= hallway_y < len(tilemap) and 0 <= hallway_y + 1 < len(tilemap):
-                    tilemap[hallway_y][x] = 0      # Floor
-                    tilemap[hallway_y + 1][x] = 0  # Floor (2 tiles wide)
+            tilemap.fill_rect(hallway_start_x, hallway_y, hallway_end_x - hallway_start_x + 1, 2, FLOOR)
         
-        # Place doors at both rooms - doors must be ON the room walls
-        if 0 <= door1_x < len(tilemap[0]) and 0 <= door1_y < len(tilemap):
-            tilemap[door1_y][door1_x] = 2      # Door
-            tilemap[door1_y + 1][door1_x] = 2  # Door (2nd door)
-        if 0 <= door2_x < len(tilemap[0]) and 0 <= door2_y < len(tilemap):
-            tilemap[door2_y][door2_x] = 2      # Door  
-            tilemap[door2_y + 1][door2_x] = 2  # Door (2nd door)
+        # Place 2-tall doors at both rooms - doors must be ON the room walls
+        tilemap.fill_rect(door1_x, door1_y, 1, 2, DOOR)
+        tilemap.fill_rect(door2_x, door2_y, 1, 2, DOOR)
     # Handle vertical connections (rooms aligned vertically)
     elif dx == 0 and abs(dy) > 0:  # Vertical connection - rooms are vertically aligned
         print(f"      Creating vertical hallway")
@@ -1216,10 +1183,7 @@ def create_direct_hallway(room1, room2, tilemap):
             print(f"        Door1 at ({door1_x}, {door1_y}), Door2 at ({door2_x}, {door2_y})")
             
             # Carve 2-wide vertical hallway that connects the doors
-            for y in range(hallway_start_y, hallway_end_y + 1):
-                if 0 <= hallway_x < len(tilemap[0]) and 0 <= hallway_x + 1 < len(tilemap[0]) and 0 <= y < len(tilemap):
-                    tilemap[y][hallway_x] = 0      # Floor
-                    tilemap[y][hallway_x + 1] = 0  # Floor (2 tiles wide)
+            tilemap.fill_rect(hallway_x, hallway_start_y, 2, hallway_end_y - hallway_start_y + 1, FLOOR)
         else:  # room2 is above room1
             # Calculate door positions at room walls - FIXED: Use floor coordinates
             room1_floor_x = room1.rect.x // 40
@@ -1241,18 +1205,11 @@ def create_direct_hallway(room1, room2, tilemap):
             print(f"        Door1 at ({door1_x}, {door1_y}), Door2 at ({door2_x}, {door2_y})")
             
             # Carve 2-wide vertical hallway that connects the doors
-            for y in range(hallway_start_y, hallway_end_y + 1):
-                if 0 <= hallway_x < len(tilemap[0]) and 0 <= hallway_x + 1 < len(tilemap[0]) and 0 <= y < len(tilemap):
-                    tilemap[y][hallway_x] = 0      # Floor
-                    tilemap[y][hallway_x + 1] = 0  # Floor (2 tiles wide)
+            tilemap.fill_rect(hallway_x, hallway_start_y, 2, hallway_end_y - hallway_start_y + 1, FLOOR)
         
-        # Place doors at both rooms - doors must be ON the room walls
-        if 0 <= door1_x < len(tilemap[0]) and 0 <= door1_y < len(tilemap):
-            tilemap[door1_y][door1_x] = 2      # Door
-            tilemap[door1_y][door1_x + 1] = 2  # Door (2nd door)
-        if 0 <= door2_x < len(tilemap[0]) and 0 <= door2_y < len(tilemap):
-            tilemap[door2_y][door2_x] = 2      # Door
-            tilemap[door2_y][door2_x + 1] = 2  # Door (2nd door)
+        # Place 2-wide doors at both rooms - doors must be ON the room walls
+        tilemap.fill_rect(door1_x, door1_y, 2, 1, DOOR)
+        tilemap.fill_rect(door2_x, door2_y, 2, 1, DOOR)
     else:
         # REJECT any connection that isn't purely horizontal or vertical
         print(f"      REJECTED: Only horizontal/vertical connections allowed (dx={dx}, dy={dy})")
@@ -0,0 +1,283 @@
+"""
+Hierarchical pathfinding - room-to-room routes over Room.connections, stitched from cached door-to-door tile paths
+"""
+from collections import deque
+from utils.tilemap import DOOR
+
+HALLWAY = -1  # Region id of everything outside rooms
+
+class RoomGraph:
+    """Long paths as a room route plus memoised tile segments between doors
+
+    Each door (a group of touching door tiles on a room's wall ring) gets one BFS field per
+    region next to it - its room and the hallways - built on first use. Changing tiles drops
+    the fields of the regions they are in."""
+
+    def __init__(self, rooms, room_index, tilemap, collider):
+        self.rooms = rooms
+        self.room_index = room_index
+        self.tilemap = tilemap
+        self.collider = collider
+        self.width = room_index.grid_width
+        self.height = room_index.grid_height
+
+        # Room id -> ids of the rooms connect_rooms joined it to
+        room_ids = {id(room): room_id for room_id, room in enumerate(rooms)}
+        self.connections = [[room_ids[id(other)] for other in getattr(room, "connections", [])] for room in rooms]
+
+        # Door id -> (room id, list of flat tile indices), and room id -> its door ids
+        self.doors = []
+        self.room_doors = {room_id: [] for room_id in range(len(rooms))}
+        self.find_doors()
+
+        self.fields = {}      # (region, door id) -> {tile: next tile toward the door}
+        self.segments = {}    # (region, from door, to door) -> tile path
+        self.door_links = None  # (room a, room b) -> (door in a, door in b) with the shortest hallway between them
+        self.routes = {}      # (start room, goal room) -> list of room ids
+
+    def find_doors(self):
+        """Group door tiles on each room's wall ring into doors"""
+        width = self.width
+        tile_size = self.room_index.tile_size
+        for room_id, room in enumerate(self.rooms):
+            left = room.rect.left // tile_size - 1
+            top = room.rect.top // tile_size - 1
+            right = room.rect.right // tile_size + 1
+            bottom = room.rect.bottom // tile_size + 1
+
+            seen = set()
+            for y in range(max(top, 0), min(bottom, self.height)):
+                for x in range(max(left, 0), min(right, width)):
+                    index = y * width + x
+                    if index in seen or not self.is_door(x, y, room_id):
+                        continue
+
+                    # Flood the touching door tiles of the same room into one door
+                    tiles = []
+                    stack = [(x, y)]
+                    seen.add(index)
+                    while stack:
+                        door_x, door_y = stack.pop()
+                        tiles.append(door_y * width + door_x)
+                        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                            next_x, next_y = door_x + dx, door_y + dy
+                            next_index = next_y * width + next_x
+                            if next_index not in seen and self.is_door(next_x, next_y, room_id):
+                                seen.add(next_index)
+                                stack.append((next_x, next_y))
+
+                    self.room_doors[room_id].append(len(self.doors))
+                    self.doors.append((room_id, tiles))
+
+    def is_door(self, x, y, room_id):
+        return self.tilemap.get(x, y) == DOOR and self.room_index.ring_room_at_tile(x, y) == room_id
+
+    def region_of(self, index):
+        """Room id owning a flat tile index, or HALLWAY"""
+        return self.room_index.owner[index]
+
+    def field(self, region, door_id):
+        """BFS field from a door through one region (its room or the hallways), built once"""
+        key = (region, door_id)
+        field = self.fields.get(key)
+        if field is not None:
+            return field
+
+        width = self.width
+        owner = self.room_index.owner
+        is_solid = self.collider.is_solid
+        door_tiles = self.doors[door_id][1]
+
+        field = {tile: tile for tile in door_tiles}
+        frontier = deque(door_tiles)
+        while frontier:
+            index = frontier.popleft()
+            x = index % width
+            y = index // width
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                next_x, next_y = x + dx, y + dy
+                if not (0 <= next_x < width and 0 <= next_y < self.height):
+                    continue
+                next_index = next_y * width + next_x
+                if next_index in field or is_solid(next_x, next_y):
+                    continue
+                # Door tiles sit on the ring (owned by no room), so they are part of both sides
+                if owner[next_index] != region and self.tilemap[next_y][next_x] != DOOR:
+                    continue
+                if region != HALLWAY and self.tilemap[next_y][next_x] == DOOR and \
+                        self.room_index.ring_room_at_tile(next_x, next_y) != region:
+                    continue
+                field[next_index] = index
+                frontier.append(next_index)
+
+        self.fields[key] = field
+        return field
+
+    def follow(self, field, start):
+        """Tile path from start to the field's door, or None if the field doesn't reach start"""
+        if start not in field:
+            return None
+        path = [start]
+        while field[path[-1]] != path[-1]:
+            path.append(field[path[-1]])
+        return path
+
+    def segment(self, region, from_door, to_door):
+        """Memoised tile path from one door to another through a region"""
+        key = (region, from_door, to_door)
+        if key not in self.segments:
+            field = self.field(region, to_door)
+            self.segments[key] = None
+            for tile in self.doors[from_door][1]:
+                path = self.follow(field, tile)
+                if path and (self.segments[key] is None or len(path) < len(self.segments[key])):
+                    self.segments[key] = path
+        return self.segments[key]
+
+    def build_door_links(self):
+        """Find which doors of connected rooms share a hallway (shortest one per room pair)"""
+        self.door_links = {}
+        for door_id, (room_id, tiles) in enumerate(self.doors):
+            for other_id in self.connections[room_id]:
+                for other_door in self.room_doors[other_id]:
+                    path = self.segment(HALLWAY, door_id, other_door)
+                    if path is None:
+                        continue
+                    best = self.door_links.get((room_id, other_id))
+                    if best is None or len(path) < best[2]:
+                        self.door_links[(room_id, other_id)] = (door_id, other_door, len(path))
+
+    def room_route(self, start_room, goal_room):
+        """Memoised fewest-rooms route over the connected rooms, or None"""
+        key = (start_room, goal_room)
+        if key in self.routes:
+            return self.routes[key]
+        if self.door_links is None:
+            self.build_door_links()
+
+        came_from = {start_room: None}
+        frontier = deque([start_room])
+        while frontier and goal_room not in came_from:
+            room_id = frontier.popleft()
+            for other_id in self.connections[room_id]:
+                if other_id not in came_from and (room_id, other_id) in self.door_links:
+                    came_from[other_id] = room_id
+                    frontier.append(other_id)
+
+        route = None
+        if goal_room in came_from:
+            route = [goal_room]
+            while came_from[route[-1]] is not None:
+                route.append(came_from[route[-1]])
+            route.reverse()
+        self.routes[key] = route
+        return route
+
+    def find_path(self, start_x, start_y, goal_x, goal_y):
+        """Tile path [(x, y), ...] from a tile in a room or hallway to a tile in a room, or None"""
+        width = self.width
+        start = start_y * width + start_x
+        goal = goal_y * width + goal_x
+        start_room = self.region_of(start)
+        goal_room = self.region_of(goal)
+        if goal_room == HALLWAY:
+            return None
+        if start_room == HALLWAY:
+            return self.path_from_hallway(start, goal, goal_room)
+
+        route = self.room_route(start_room, goal_room)
+        if route is None:
+            return None
+        if len(route) == 1:
+            return self.local_path(start_room, start, goal)
+
+        # Start tile to the first exit door, then the hallway to the next room
+        exit_door, entry_door, length = self.door_links[(route[0], route[1])]
+        path = self.follow(self.field(start_room, exit_door), start)
+        if path is None:
+            return None
+        self.join(path, self.segment(HALLWAY, exit_door, entry_door))
+        return self.continue_route(path, route[1:], entry_door, goal)
+
+    def path_from_hallway(self, start, goal, goal_room):
+        """Leave the hallway by the door with the fewest rooms left to cross (nearest on ties), then route on"""
+        if self.door_links is None:
+            self.build_door_links()
+
+        best = None
+        for door_id, (room_id, tiles) in enumerate(self.doors):
+            leg = self.follow(self.field(HALLWAY, door_id), start)
+            if leg is None:
+                continue
+            route = self.room_route(room_id, goal_room)
+            if route is not None and (best is None or (len(route), len(leg)) < best[0]):
+                best = ((len(route), len(leg)), door_id, leg, route)
+
+        if best is None:
+            return None
+        cost, entry_door, path, route = best
+        return self.continue_route(path, route, entry_door, goal)
+
+    def continue_route(self, path, route, entry_door, goal):
+        """Extend a path that reached entry_door of route[0] across the remaining rooms to the goal tile"""
+        for i in range(len(route) - 1):
+            # Across this room to its exit door, then the hallway to the next room
+            exit_door, next_entry, length = self.door_links[(route[i], route[i + 1])]
+            crossing = self.segment(route[i], entry_door, exit_door)
+            if crossing is None:
+                return None
+            self.join(path, crossing)
+            self.join(path, self.segment(HALLWAY, exit_door, next_entry))
+            entry_door = next_entry
+
+        # Entry door of the goal room to the goal tile
+        last_leg = self.follow(self.field(route[-1], entry_door), goal)
+        if last_leg is None:
+            return None
+        last_leg.reverse()
+        self.join(path, last_leg)
+        return [(index % self.width, index // self.width) for index in path]
+
+    def join(self, path, segment):
+        """Append a segment to a path, skipping its first tile if the path already ends there"""
+        path.extend(segment[1:] if segment[0] == path[-1] else segment)
+
+    def local_path(self, room_id, start, goal):
+        """Tile path inside one room (not cached, rooms are small)"""
+        width = self.width
+        came_from = {start: None}
+        frontier = deque([start])
+        while frontier and goal not in came_from:
+            index = frontier.popleft()
+            x = index % width
+            y = index // width
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                next_index = (y + dy) * width + x + dx
+                if next_index in came_from or self.collider.is_solid(x + dx, y + dy):
+                    continue
+                if self.region_of(next_index) != room_id:
+                    continue
+                came_from[next_index] = index
+                frontier.append(next_index)
+
+        if goal not in came_from:
+            return None
+        path = [goal]
+        while came_from[path[-1]] is not None:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return [(index % width, index // width) for index in path]
+
+    def invalidate_tiles(self, x, y, w=1, h=1):
+        """Drop the cached fields and paths of the regions touching a changed tile rect"""
+        regions = set()
+        for tile_y in range(max(y - 1, 0), min(y + h + 1, self.height)):
+            for tile_x in range(max(x - 1, 0), min(x + w + 1, self.width)):
+                regions.add(self.region_of(tile_y * self.width + tile_x))
+
+        self.fields = {key: field for key, field in self.fields.items() if key[0] not in regions}
+        self.segments = {key: path for key, path in self.segments.items() if key[0] not in regions}
+        if HALLWAY in regions:
+            # Hallway paths decide which rooms are linked
+            self.door_links = None
+            self.routes = {}
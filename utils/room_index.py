@@ -0,0 +1,50 @@
+"""
+Tile-to-room ownership index for O(1) "which room is this in?" lookups
+"""
+from array import array
+
+class RoomIndex:
+    def __init__(self, rooms, grid_width, grid_height, tile_size):
+        self.rooms = rooms
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.tile_size = tile_size
+
+        # Room index owning each floor tile, -1 for hallways and walls
+        self.owner = array('h', [-1]) * (grid_width * grid_height)
+        # Room index whose surrounding wall ring contains each tile (where doors live), -1 for none
+        self.ring_owner = array('h', [-1]) * (grid_width * grid_height)
+
+        for i, room in enumerate(rooms):
+            left = room.rect.left // tile_size
+            right = room.rect.right // tile_size
+            top = room.rect.top // tile_size
+            bottom = room.rect.bottom // tile_size
+
+            for y in range(max(top, 0), min(bottom, grid_height)):
+                row_start = y * grid_width
+                for x in range(max(left, 0), min(right, grid_width)):
+                    self.owner[row_start + x] = i
+
+            # Wall ring one tile outside the floor
+            for y in range(max(top - 1, 0), min(bottom + 1, grid_height)):
+                row_start = y * grid_width
+                for x in range(max(left - 1, 0), min(right + 1, grid_width)):
+                    if not (left <= x < right and top <= y < bottom):
+                        self.ring_owner[row_start + x] = i
+
+    def room_at_tile(self, x, y):
+        """Return the index of the room whose floor contains a tile, or -1"""
+        if 0 <= x < self.grid_width and 0 <= y < self.grid_height:
+            return self.owner[y * self.grid_width + x]
+        return -1
+
+    def room_at_point(self, px, py):
+        """Return the index of the room containing a pixel position, or -1"""
+        return self.room_at_tile(int(px) // self.tile_size, int(py) // self.tile_size)
+
+    def ring_room_at_tile(self, x, y):
+        """Return the index of the room whose wall ring contains a tile (e.g. its doors), or -1"""
+        if 0 <= x < self.grid_width and 0 <= y < self.grid_height:
+            return self.ring_owner[y * self.grid_width + x]
+        return -1
@@ -55,3 +55,117 @@ class SpatialGrid:
         self.clear()
         for sprite in sprite_group:
             self.insert(sprite, sprite.rect)
+
+
+class DynamicSpatialGrid(SpatialGrid):
+    """Spatial grid for moving objects, updated incrementally instead of rebuilt every frame"""
+
+    def __init__(self, cell_size=64):
+        super().__init__(cell_size)
+        self.grid = {}          # Cell -> set of objects
+        self.object_cells = {}  # Object -> (min_x, min_y, max_x, max_y) cell range it is stored in
+        self.query_stamps = {}  # Object -> id of the last query that returned it
+        self.query_id = 0
+
+    def clear(self):
+        """Clear all objects from the grid"""
+        self.grid.clear()
+        self.object_cells.clear()
+        self.query_stamps.clear()
+
+    def cell_range(self, rect):
+        cell_size = self.cell_size
+        return (rect.left // cell_size, rect.top // cell_size,
+                rect.right // cell_size, rect.bottom // cell_size)
+
+    def add_to_cells(self, obj, cells):
+        min_x, min_y, max_x, max_y = cells
+        for y in range(min_y, max_y + 1):
+            for x in range(min_x, max_x + 1):
+                cell = self.grid.get((x, y))
+                if cell is None:
+                    cell = self.grid[(x, y)] = set()
+                cell.add(obj)
+
+    def remove_from_cells(self, obj, cells):
+        min_x, min_y, max_x, max_y = cells
+        for y in range(min_y, max_y + 1):
+            for x in range(min_x, max_x + 1):
+                cell = self.grid.get((x, y))
+                if cell is not None:
+                    cell.discard(obj)
+                    if not cell:
+                        del self.grid[(x, y)]
+
+    def insert(self, obj, rect):
+        """Insert an object, or move it if it is already in the grid"""
+        self.move(obj, None, rect)
+
+    def move(self, obj, old_rect, new_rect):
+        """Update an object's cells after it moved - only touches the grid if it crossed a cell border"""
+        cells = self.cell_range(new_rect)
+        old_cells = self.object_cells.get(obj)
+        if old_cells == cells:
+            return
+        if old_cells is not None:
+            self.remove_from_cells(obj, old_cells)
+        self.add_to_cells(obj, cells)
+        self.object_cells[obj] = cells
+
+    def remove(self, obj):
+        """Remove an object from the grid (no-op if it is not in it)"""
+        cells = self.object_cells.pop(obj, None)
+        if cells is not None:
+            self.remove_from_cells(obj, cells)
+            self.query_stamps.pop(obj, None)
+
+    def __contains__(self, obj):
+        return obj in self.object_cells
+
+    def __len__(self):
+        return len(self.object_cells)
+
+    def query(self, rect, padding=0):
+        """Yield each object stored in the cells overlapping rect (grown by padding) once"""
+        self.query_id += 1
+        query_id = self.query_id
+        stamps = self.query_stamps
+        cell_size = self.cell_size
+        grid = self.grid
+
+        for y in range((rect.top - padding) // cell_size, (rect.bottom + padding) // cell_size + 1):
+            for x in range((rect.left - padding) // cell_size, (rect.right + padding) // cell_size + 1):
+                cell = grid.get((x, y))
+                if cell is None:
+                    continue
+                for obj in cell:
+                    # Objects spanning several cells are only yielded the first time
+                    if stamps.get(obj) != query_id:
+                        stamps[obj] = query_id
+                        yield obj
+
+    def get_nearby_objects(self, rect, padding=0):
+        """Get all objects near the given rect"""
+        return list(self.query(rect, padding))
+
+
+class SpatialGroup(pygame.sprite.Group):
+    """Sprite group that keeps its sprites in a DynamicSpatialGrid, removed automatically on kill()"""
+
+    def __init__(self, *sprites, cell_size=64):
+        self.spatial_grid = DynamicSpatialGrid(cell_size)
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.spatial_grid.insert(sprite, sprite.rect)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.spatial_grid.remove(sprite)
+
+    def query(self, rect, padding=0):
+        """Yield sprites in the cells near rect (broadphase - may include sprites that do not overlap it)
+
+        Don't add or kill sprites while iterating, take a list() first."""
+        return self.spatial_grid.query(rect, padding)
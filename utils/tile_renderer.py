@@ -0,0 +1,187 @@
+"""
+Chunked tile layers so the renderer blits a few surfaces instead of drawing every tile
+"""
+import pygame
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from utils.tilemap import FLOOR, WALL, DOOR
+
+class ChunkLayer(ABC):
+    """Base class for layers baked into chunk surfaces and blitted per visible chunk"""
+
+    def __init__(self, tilemap, tile_size, chunk_tiles=8, view_size=None):
+        self.tilemap = tilemap
+        self.tile_size = tile_size
+        self.chunk_tiles = chunk_tiles
+        self.chunk_pixels = chunk_tiles * tile_size
+        self.grid_width = len(tilemap[0])
+        self.grid_height = len(tilemap)
+
+        # Baked chunks are built lazily the first time they scroll into view and
+        # the least recently drawn ones are dropped so memory stays bounded
+        self.max_cached_chunks = self.screen_footprint(view_size)
+        self.chunks = OrderedDict()
+
+    def screen_footprint(self, view_size):
+        """Chunks the view can overlap at once, plus one row and column of margin for scrolling back"""
+        if view_size is None:
+            display = pygame.display.get_surface()
+            view_size = display.get_size() if display else (self.chunk_pixels, self.chunk_pixels)
+        columns = -(-view_size[0] // self.chunk_pixels) + 1
+        rows = -(-view_size[1] // self.chunk_pixels) + 1
+        return (columns + 1) * (rows + 1)
+
+    def invalidate_tiles(self, x, y, w=1, h=1):
+        """Mark the chunks covering a tile rectangle for rebuild"""
+        for chunk_y in range(y // self.chunk_tiles, (y + h - 1) // self.chunk_tiles + 1):
+            for chunk_x in range(x // self.chunk_tiles, (x + w - 1) // self.chunk_tiles + 1):
+                self.chunks.pop((chunk_x, chunk_y), None)
+
+    def chunk_bounds(self, chunk_x, chunk_y):
+        """Return the (x_start, y_start, x_end, y_end) tile range covered by a chunk"""
+        x_start = chunk_x * self.chunk_tiles
+        y_start = chunk_y * self.chunk_tiles
+        return (x_start, y_start,
+                min(x_start + self.chunk_tiles, self.grid_width),
+                min(y_start + self.chunk_tiles, self.grid_height))
+
+    @abstractmethod
+    def build_chunk(self, chunk_x, chunk_y):
+        """Bake one chunk into a surface, or return None if it draws nothing"""
+
+    def get_chunk(self, chunk_x, chunk_y):
+        """Return the baked surface for a chunk, building it if needed"""
+        key = (chunk_x, chunk_y)
+        if key in self.chunks:
+            self.chunks.move_to_end(key)
+            return self.chunks[key]
+
+        surface = self.build_chunk(chunk_x, chunk_y)
+        self.chunks[key] = surface
+        if len(self.chunks) > self.max_cached_chunks:
+            self.chunks.popitem(last=False)
+        return surface
+
+    def draw(self, screen, camera_rect):
+        """Blit every chunk that overlaps the camera"""
+        chunk_x_start = max(camera_rect.left // self.chunk_pixels, 0)
+        chunk_x_end = min(camera_rect.right // self.chunk_pixels, (self.grid_width - 1) // self.chunk_tiles)
+        chunk_y_start = max(camera_rect.top // self.chunk_pixels, 0)
+        chunk_y_end = min(camera_rect.bottom // self.chunk_pixels, (self.grid_height - 1) // self.chunk_tiles)
+
+        for chunk_y in range(chunk_y_start, chunk_y_end + 1):
+            for chunk_x in range(chunk_x_start, chunk_x_end + 1):
+                surface = self.get_chunk(chunk_x, chunk_y)
+                if surface is not None:
+                    screen.blit(surface, (chunk_x * self.chunk_pixels - camera_rect.x,
+                                          chunk_y * self.chunk_pixels - camera_rect.y))
+
+class ChunkedTileLayer(ChunkLayer):
+    """Static tiles (walls, floors, doors, chests, holes), rebuilt only when a chunk's tiles change"""
+
+    def __init__(self, tilemap, tile_size, tile_colors, background_color, room_index=None,
+                 room_floor_colors=None, wall_mask=None, chunk_tiles=8, view_size=None):
+        super().__init__(tilemap, tile_size, chunk_tiles, view_size)
+        self.tile_colors = tile_colors  # Tile type -> color, tiles not listed are left as background
+        self.background_color = background_color
+        self.wall_mask = wall_mask  # Only wall edges in the mask are drawn, inner walls stay background
+        self.room_index = room_index
+        self.room_floor_colors = room_floor_colors or {}  # Room type -> floor color override
+
+    def build_chunk(self, chunk_x, chunk_y):
+        """Bake one chunk of the tilemap into its own surface"""
+        tile_size = self.tile_size
+        x_start, y_start, x_end, y_end = self.chunk_bounds(chunk_x, chunk_y)
+
+        surface = pygame.Surface(((x_end - x_start) * tile_size, (y_end - y_start) * tile_size))
+        if pygame.display.get_surface():
+            surface = surface.convert()
+        surface.fill(self.background_color)
+
+        for y in range(y_start, y_end):
+            row = self.tilemap[y]
+            for x in range(x_start, x_end):
+                color = self.tile_colors.get(row[x])
+                if color is None:
+                    continue
+                if row[x] == WALL and self.wall_mask and not self.wall_mask.is_edge(x, y):
+                    continue
+
+                if row[x] == FLOOR and self.room_index:
+                    room_id = self.room_index.room_at_tile(x, y)
+                    if room_id != -1:
+                        color = self.room_floor_colors.get(self.room_index.rooms[room_id].room_type, color)
+
+                surface.fill(color, ((x - x_start) * tile_size, (y - y_start) * tile_size, tile_size, tile_size))
+
+        return surface
+
+class FogOverlayLayer(ChunkLayer):
+    """Fog of war as one per-pixel-alpha surface per chunk, rebuilt only when visibility changes"""
+
+    def __init__(self, tilemap, tile_size, visibility, room_index, room_discovered,
+                 fog_alpha=180, chunk_tiles=8, view_size=None):
+        super().__init__(tilemap, tile_size, chunk_tiles, view_size)
+        self.visibility = visibility
+        self.room_index = room_index
+        self.room_discovered = room_discovered
+        self.fog_alpha = fog_alpha
+
+    def tile_alpha(self, x, y):
+        """How strongly a tile is darkened: 255 hidden, fog_alpha remembered, 0 visible"""
+        # Undiscovered rooms are completely black, walls included
+        room_id = self.room_index.room_at_tile(x, y)
+        if room_id != -1 and not self.room_discovered[room_id]:
+            return 255
+
+        # Walls are never fogged
+        tile = self.tilemap[y][x]
+        if tile == WALL:
+            return 0
+
+        if not self.visibility.explored[y][x]:
+            return 255  # Completely black if never explored
+        if self.visibility.fog[y][x]:
+            return 0
+
+        # Doors on the wall of a discovered room stay visible
+        if tile == DOOR:
+            door_room_id = self.room_index.ring_room_at_tile(x, y)
+            if door_room_id != -1 and self.room_discovered[door_room_id]:
+                return 0
+        return self.fog_alpha
+
+    def update(self):
+        """Invalidate chunks touched by visibility changes since the last frame, returns the changed tile rects"""
+        dirty_rects = self.visibility.pop_dirty()
+        for x, y, w, h in dirty_rects:
+            self.invalidate_tiles(x, y, w, h)
+        return dirty_rects
+
+    def build_chunk(self, chunk_x, chunk_y):
+        """Build a one-pixel-per-tile alpha mask for the chunk and scale it up by the tile size"""
+        x_start, y_start, x_end, y_end = self.chunk_bounds(chunk_x, chunk_y)
+        width = x_end - x_start
+        height = y_end - y_start
+
+        # Black RGBA pixels, only alpha varies
+        pixels = bytearray(width * height * 4)
+        any_fog = False
+        i = 3
+        for y in range(y_start, y_end):
+            for x in range(x_start, x_end):
+                alpha = self.tile_alpha(x, y)
+                if alpha:
+                    pixels[i] = alpha
+                    any_fog = True
+                i += 4
+
+        # Fully visible chunks need no blit at all
+        if not any_fog:
+            return None
+
+        mask = pygame.image.frombuffer(pixels, (width, height), "RGBA")
+        surface = pygame.transform.scale(mask, (width * self.tile_size, height * self.tile_size))
+        if pygame.display.get_surface():
+            surface = surface.convert_alpha()
+        return surface
@@ -0,0 +1,69 @@
+"""
+Array-backed tile map shared by the room generator, renderer and scenes
+"""
+
+# Tile types
+FLOOR = 0
+WALL = 1
+DOOR = 2
+CHEST_UNLOCKED = 3
+CHEST_LOCKED = 4
+HOLE = 5
+CHEST_OPENED = 6
+
+class TileMap:
+    """A grid of uint8 tiles in one contiguous bytearray, indexed as tilemap[y][x] through row views"""
+
+    def __init__(self, width, height, fill=FLOOR):
+        self.width = width
+        self.height = height
+        self.buffer = bytearray([fill]) * (width * height)
+        self.rows = self.make_rows()
+
+    def make_rows(self):
+        """Create one memoryview per row into the buffer"""
+        view = memoryview(self.buffer)
+        return [view[y * self.width:(y + 1) * self.width] for y in range(self.height)]
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y):
+        return self.rows[y]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def get(self, x, y, default=None):
+        """Return the tile at (x, y), or default when out of bounds"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.buffer[y * self.width + x]
+        return default
+
+    def fill(self, value):
+        """Set every tile to value"""
+        self.buffer[:] = bytes([value]) * len(self.buffer)
+
+    def fill_rect(self, x, y, w, h, value):
+        """Stamp a rectangle of tiles with value, clipped to the map"""
+        left = max(x, 0)
+        right = min(x + w, self.width)
+        top = max(y, 0)
+        bottom = min(y + h, self.height)
+        if left >= right or top >= bottom:
+            return
+
+        span = bytes([value]) * (right - left)
+        for row_y in range(top, bottom):
+            start = row_y * self.width + left
+            self.buffer[start:start + len(span)] = span
+
+    def swap(self, other):
+        """Exchange contents with another map in O(1) by swapping buffers"""
+        self.width, other.width = other.width, self.width
+        self.height, other.height = other.height, self.height
+        self.buffer, other.buffer = other.buffer, self.buffer
+        self.rows, other.rows = other.rows, self.rows
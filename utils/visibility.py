@@ -0,0 +1,156 @@
+"""
+Incremental fog-of-war state that only changes when the player moves to a different area
+"""
+from utils.tilemap import TileMap, FLOOR, WALL, DOOR
+
+class Visibility:
+    def __init__(self, tilemap, room_index):
+        self.tilemap = tilemap
+        self.room_index = room_index
+        self.rooms = room_index.rooms
+        self.tile_size = room_index.tile_size
+        self.grid_width = tilemap.width
+        self.grid_height = tilemap.height
+
+        # Per-tile flags: 1 = currently visible / explored at some point
+        self.fog = TileMap(self.grid_width, self.grid_height, fill=0)
+        self.explored = TileMap(self.grid_width, self.grid_height, fill=0)
+
+        # Currently lit area, e.g. ("room", 3) or ("hallway", 0), and the tile rects it lit
+        self.area = None
+        self.lit_rects = []
+
+        # Hallway networks discovered so far, their tiles merged into rects, and which network each hallway tile belongs to
+        self.hallway_networks = []
+        self.hallway_network_rects = []
+        self.hallway_network_at = {}
+
+        # Tile rects (x, y, w, h) whose visibility changed since the renderer last asked
+        self.dirty_rects = []
+
+    def mark_dirty(self, x, y, w, h):
+        """Record a tile rect whose rendering depends on visibility state that changed"""
+        self.dirty_rects.append((x, y, w, h))
+
+    def pop_dirty(self):
+        """Return and clear the tile rects changed since the last call"""
+        dirty_rects = self.dirty_rects
+        self.dirty_rects = []
+        return dirty_rects
+
+    def set_area(self, area, lit_rects):
+        """Light a new area and un-light the previous one, doing nothing if the area is unchanged"""
+        if area == self.area:
+            return False
+
+        for x, y, w, h in self.lit_rects:
+            self.fog.fill_rect(x, y, w, h, 0)
+            self.mark_dirty(x, y, w, h)
+
+        for x, y, w, h in lit_rects:
+            self.fog.fill_rect(x, y, w, h, 1)
+            self.explored.fill_rect(x, y, w, h, 1)
+            self.mark_dirty(x, y, w, h)
+
+        self.area = area
+        self.lit_rects = lit_rects
+        return True
+
+    def show_room(self, room_id):
+        """Light up a room's floor and the doors on its walls"""
+        if self.area == ("room", room_id):
+            return False
+
+        room = self.rooms[room_id]
+        left = room.rect.left // self.tile_size
+        right = room.rect.right // self.tile_size
+        top = room.rect.top // self.tile_size
+        bottom = room.rect.bottom // self.tile_size
+        lit_rects = [(left, top, right - left, bottom - top)]
+
+        # Doors sit on the wall ring one tile outside the floor
+        for y in range(top - 1, bottom + 1):
+            for x in range(left - 1, right + 1):
+                if (self.tilemap.get(x, y) == DOOR and
+                    self.room_index.ring_room_at_tile(x, y) == room_id):
+                    lit_rects.append((x, y, 1, 1))
+
+        return self.set_area(("room", room_id), lit_rects)
+
+    def show_hallway(self, x, y):
+        """Light up the whole hallway network containing a tile"""
+        network_id = self.hallway_network_at.get((x, y))
+        if network_id is None:
+            network_id = self.discover_hallway_network(x, y)
+
+        if self.area == ("hallway", network_id):
+            return False
+        return self.set_area(("hallway", network_id), self.hallway_network_rects[network_id])
+
+    def hide(self):
+        """Nothing is currently lit (e.g. standing in a doorway)"""
+        return self.set_area(None, [])
+
+    def discover_hallway_network(self, start_x, start_y):
+        """Flood-fill all connected hallway tiles (floor/door outside any room) and cache them"""
+        network_id = len(self.hallway_networks)
+        stack = [(start_x, start_y)]
+        network = set()
+
+        while stack:
+            x, y = stack.pop()
+
+            if (x, y) in network:
+                continue
+            if not self.tilemap.in_bounds(x, y):
+                continue
+            if self.tilemap[y][x] == WALL:  # Wall - stop here
+                continue
+
+            # Only include if it's a hallway tile (floor/door not in any room)
+            if self.room_index.room_at_tile(x, y) == -1 and self.tilemap[y][x] in (FLOOR, DOOR):
+                network.add((x, y))
+                self.hallway_network_at[(x, y)] = network_id
+
+                # Add adjacent tiles to stack
+                for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                    stack.append((x + dx, y + dy))
+
+        # The starting tile may be a hallway chest/hole tile that is not itself part of the network
+        self.hallway_network_at[(start_x, start_y)] = network_id
+        self.hallway_networks.append(network)
+        self.hallway_network_rects.append(merge_tiles(network))
+        return network_id
+
+def merge_tiles(tiles):
+    """Cover a set of (x, y) tiles with few (x, y, w, h) rects - horizontal runs, stacked where rows repeat"""
+    rows = {}
+    for x, y in tiles:
+        rows.setdefault(y, []).append(x)
+
+    rects = []
+    open_rects = {}  # (x, w) of a run -> index of the rect it extends down
+    for y in sorted(rows):
+        xs = sorted(rows[y])
+        runs = []
+        start = previous = xs[0]
+        for x in xs[1:]:
+            if x != previous + 1:
+                runs.append((start, previous - start + 1))
+                start = x
+            previous = x
+        runs.append((start, previous - start + 1))
+
+        # A run identical to one directly above grows that rect instead of starting a new one
+        still_open = {}
+        for run in runs:
+            index = open_rects.get(run)
+            if index is not None and rects[index][1] + rects[index][3] == y:
+                x, top, w, h = rects[index]
+                rects[index] = (x, top, w, h + 1)
+            else:
+                index = len(rects)
+                rects.append((run[0], y, run[1], 1))
+            still_open[run] = index
+        open_rects = still_open
+    return rects
@@ -0,0 +1,46 @@
+"""
+Precomputed mask of wall tiles that border a non-wall tile (the only walls worth drawing)
+"""
+from utils.tilemap import TileMap, WALL
+
+NEIGHBOURS = [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+
+class WallEdgeMask:
+    def __init__(self, tilemap):
+        self.tilemap = tilemap
+        self.mask = TileMap(tilemap.width, tilemap.height, fill=0)  # 1 = visible wall edge
+        self.rebuild()
+
+    def is_edge(self, x, y):
+        """Check if a tile is a wall with at least one non-wall neighbour"""
+        return self.mask.get(x, y, 0) == 1
+
+    def rebuild(self):
+        """Recompute the whole mask (once per world)"""
+        tilemap = self.tilemap
+        self.mask.fill(0)
+
+        # Walk the open tiles (far fewer than walls) and flag the walls around them
+        for y in range(tilemap.height):
+            row = tilemap[y]
+            for x in range(tilemap.width):
+                if row[x] == WALL:
+                    continue
+                for dx, dy in NEIGHBOURS:
+                    check_x, check_y = x + dx, y + dy
+                    if tilemap.get(check_x, check_y) == WALL:
+                        self.mask[check_y][check_x] = 1
+
+    def update_tiles(self, x, y, w=1, h=1):
+        """Recompute the mask around a tile rectangle whose tiles changed"""
+        tilemap = self.tilemap
+        for check_y in range(max(y - 1, 0), min(y + h + 1, tilemap.height)):
+            for check_x in range(max(x - 1, 0), min(x + w + 1, tilemap.width)):
+                is_edge = False
+                if tilemap[check_y][check_x] == WALL:
+                    for dx, dy in NEIGHBOURS:
+                        neighbour = tilemap.get(check_x + dx, check_y + dy)
+                        if neighbour is not None and neighbour != WALL:
+                            is_edge = True
+                            break
+                self.mask[check_y][check_x] = 1 if is_edge else 0
@@ -0,0 +1,365 @@
+"""
+Seeded world generation - the same seed and config always build the same world
+"""
+import os
+import sys
+import random
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import pygame
+from utils.room_generator import generate_rooms, connect_rooms
+from utils.tilemap import TileMap, FLOOR, WALL, DOOR
+from data.room import Room
+from entities.spawn import EnemySpawn
+
+ENEMY_TYPES = ["basic", "fast", "tank"]
+ENEMY_WEIGHTS = [60, 30, 10]  # Basic: 60%, Fast: 30%, Tank: 10%
+
+class WorldConfig:
+    """Size and room count of a generated world"""
+
+    def __init__(self, world_width=6400, world_height=5200, tile_size=40, room_amt=16, max_attempts=100):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.tile_size = tile_size
+        self.grid_width = world_width // tile_size
+        self.grid_height = world_height // tile_size
+        self.room_amt = room_amt
+        self.max_attempts = max_attempts  # Whole-world retries before giving up
+
+class World:
+    """A generated world: rooms, hallways, tiles, the enemies planned per room and a seed for the enemy AI"""
+
+    def __init__(self, seed, rooms, hallways, tilemap, room_spawns, ai_seed):
+        self.seed = seed
+        self.rooms = rooms
+        self.hallways = hallways
+        self.tilemap = tilemap
+        self.room_spawns = room_spawns
+        self.ai_seed = ai_seed
+
+    def ai_rng(self):
+        """NumPy generator for the enemy AI, the same sequence every time for this world"""
+        return np.random.default_rng(self.ai_seed)
+
+class WorldDescription:
+    """Compact, picklable copy of a World - tile bytes and plain tuples, no pygame objects"""
+
+    def __init__(self, world, attempt):
+        self.seed = world.seed
+        self.attempt = attempt
+        self.grid_width = world.tilemap.width
+        self.grid_height = world.tilemap.height
+        self.tiles = bytes(world.tilemap.buffer)
+        room_ids = {id(room): room_id for room_id, room in enumerate(world.rooms)}
+        self.rooms = [(tuple(room.rect), room.room_type, room.grid_x, room.grid_y, room.single_connection,
+                       tuple(room_ids[id(other)] for other in room.connections)) for room in world.rooms]
+        self.hallways = [tuple(hallway) for hallway in world.hallways]
+        self.room_spawns = {room_id: [(spawn.enemy_type, spawn.x, spawn.y) for spawn in spawns]
+                            for room_id, spawns in world.room_spawns.items()}
+        self.ai_seed = world.ai_seed
+
+    def to_world(self):
+        """Rebuild the World this describes"""
+        tilemap = TileMap(self.grid_width, self.grid_height, fill=WALL)
+        tilemap.buffer[:] = self.tiles
+
+        rooms = []
+        for (x, y, w, h), room_type, grid_x, grid_y, single_connection, _ in self.rooms:
+            room = Room(x, y, w, h, room_type)
+            room.grid_x = grid_x
+            room.grid_y = grid_y
+            room.single_connection = single_connection
+            rooms.append(room)
+        for room, description in zip(rooms, self.rooms):
+            room.connections = [rooms[other] for other in description[5]]
+
+        hallways = [pygame.Rect(hallway) for hallway in self.hallways]
+        room_spawns = {room_id: [EnemySpawn(*spawn) for spawn in spawns] for room_id, spawns in self.room_spawns.items()}
+        return World(self.seed, rooms, hallways, tilemap, room_spawns, self.ai_seed)
+
+def rng_stream(seed, name, attempt=None):
+    """Random stream for one subsystem, independent of the others and derived only from the seed"""
+    key = f"{seed}/{name}" if attempt is None else f"{seed}/{name}/{attempt}"
+    return random.Random(key)
+
+def generate_attempt(seed, attempt, config):
+    """One seeded generation attempt, returns the World or None if it didn't produce a valid one"""
+    print(f"🌍 Generating world attempt {attempt}...")
+
+    # Create fresh tilemap for this attempt
+    tilemap = TileMap(config.grid_width, config.grid_height, fill=WALL)
+
+    try:
+        # Generate rooms
+        rooms = generate_rooms(config.room_amt, config.world_width, config.world_height, config.tile_size, tilemap,
+                               rng_stream(seed, "layout", attempt), rng_stream(seed, "room_types", attempt))
+
+        if not rooms:
+            print(f"❌ Attempt {attempt}: Room generation failed")
+            return None
+
+        # Connect rooms
+        hallways = connect_rooms(rooms, config.tile_size, tilemap, rng_stream(seed, "hallways", attempt))
+
+        # Validate the world
+        is_valid, message = validate_world(rooms, tilemap, config)
+
+        if is_valid:
+            print(f"✅ Attempt {attempt}: Valid world generated! {message}")
+            room_spawns = spawn_enemies_in_rooms(rooms, config.tile_size, rng_stream(seed, "enemies"))
+            return World(seed, rooms, hallways, tilemap, room_spawns, rng_stream(seed, "ai").getrandbits(64))
+        else:
+            print(f"❌ Attempt {attempt}: Invalid world - {message}")
+
+    except Exception as e:
+        print(f"❌ Attempt {attempt}: Generation failed with error - {e}")
+    return None
+
+def generate_world(seed, config=None):
+    """Generate worlds from a seed until one is valid, returns the World or None after max_attempts
+
+    Layout, room typing and hallways get fresh streams per attempt, so the attempt a seed
+    succeeds on (and everything it produces) is fixed. Enemy spawns and AI draw from their own streams."""
+    config = config if config is not None else WorldConfig()
+
+    for attempt in range(1, config.max_attempts + 1):
+        world = generate_attempt(seed, attempt, config)
+        if world is not None:
+            return world
+
+    print(f"🚫 Stopping after {config.max_attempts} attempts to prevent infinite loop")
+    return None
+
+def describe_attempt(seed, attempt, config):
+    """Worker side of generate_world_parallel - a WorldDescription, or None for an invalid attempt"""
+    world = generate_attempt(seed, attempt, config)
+    return WorldDescription(world, attempt) if world is not None else None
+
+def describe_world(seed, config):
+    """Worker side of WorldPool - generate_world's world as a WorldDescription, or None"""
+    for attempt in range(1, config.max_attempts + 1):
+        description = describe_attempt(seed, attempt, config)
+        if description is not None:
+            return description
+    return None
+
+def quiet_worker():
+    """Pool initializer - the generators' debug output goes nowhere in the workers"""
+    sys.stdout = open(os.devnull, "w")
+
+def pool_context():
+    """Forked workers on Linux, spawned ones elsewhere (forking isn't safe on macOS and Windows has no fork)
+
+    Forking is only safe before SDL is initialised, which is why start_pool starts every worker up front."""
+    if sys.platform.startswith("linux"):
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+def start_pool(workers=None):
+    """Process pool for world generation with all its workers already running
+
+    Create it before pygame.init() so forked workers never inherit an initialised SDL."""
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(workers, mp_context=pool_context(), initializer=quiet_worker)
+    for future in [pool.submit(os.getpid) for _ in range(workers)]:
+        future.result()
+    return pool
+
+def generate_world_parallel(seed, config=None, pool=None, workers=None):
+    """generate_world with the attempts farmed out to a process pool, returns a WorldDescription or None
+
+    Attempts are speculative - twice as many as there are workers are in flight - and the
+    lowest-numbered valid one wins, so the result is the world generate_world would build.
+    As soon as that is known the attempts still queued are cancelled and the call returns
+    without waiting for the ones already running. Without a pool (from start_pool) a
+    temporary one is started for the call. workers is the pool's size (the CPU count by default)."""
+    config = config if config is not None else WorldConfig()
+    workers = workers or os.cpu_count() or 1
+    own_pool = pool is None
+    if own_pool:
+        pool = start_pool(workers)
+
+    pending = {}  # Future -> attempt number
+    results = {}  # Attempt number -> WorldDescription or None
+    next_attempt = 1
+    decided = 0  # Every attempt up to this one finished invalid
+    try:
+        while decided < config.max_attempts:
+            # Keep the pool busy with the next attempts in order
+            while len(pending) < workers * 2 and next_attempt <= config.max_attempts:
+                pending[pool.submit(describe_attempt, seed, next_attempt, config)] = next_attempt
+                next_attempt += 1
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                attempt = pending.pop(future)
+                try:
+                    results[attempt] = future.result()
+                except Exception as e:
+                    print(f"❌ Attempt {attempt}: Worker failed with error - {e}")
+                    results[attempt] = None
+
+            # The first valid world counts only once every attempt before it has failed
+            while decided + 1 in results:
+                if results[decided + 1] is not None:
+                    description = results[decided + 1]
+                    print(f"✅ Attempt {description.attempt}: Valid world generated ({len(results)} attempts tried)")
+                    return description
+                decided += 1
+    finally:
+        if own_pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            for future in pending:
+                future.cancel()
+
+    print(f"🚫 Stopping after {config.max_attempts} attempts to prevent infinite loop")
+    return None
+
+def spawn_enemies_in_rooms(rooms, tile_size, rng=random):
+    """Plan enemies randomly in rooms (excluding spawn room, chest rooms, and shop rooms)
+
+    Returns room index -> list of EnemySpawn, the sprites are created when the room is discovered"""
+    room_spawns = {}
+
+    # Skip spawn room, chest rooms, and shop rooms
+    eligible_rooms = []
+    for room_id, room in enumerate(rooms):
+        if room.room_type == "normal":  # Only normal rooms get enemies
+            eligible_rooms.append(room_id)
+
+    for room_id in eligible_rooms:
+        room = rooms[room_id]
+        spawns = room_spawns[room_id] = []
+        # Number of enemies per room (1-3)
+        num_enemies = rng.randint(1, 3)
+
+        for _ in range(num_enemies):
+            # Random position within room bounds (with some padding)
+            padding = tile_size
+            x = rng.randint(room.rect.left + padding, room.rect.right - padding)
+            y = rng.randint(room.rect.top + padding, room.rect.bottom - padding)
+
+            # Random enemy type with weighted probability
+            enemy_type = rng.choices(ENEMY_TYPES, weights=ENEMY_WEIGHTS, k=1)[0]
+
+            spawns.append(EnemySpawn(enemy_type, x, y))
+
+    return room_spawns
+
+def validate_world(rooms, tilemap, config):
+    """Validate that a generated world meets all requirements for a playable game"""
+    if not rooms:
+        return False, "No rooms generated"
+    
+    if len(rooms) < config.room_amt:
+        return False, f"Only {len(rooms)} rooms generated, need {config.room_amt}"
+    
+    # Check for spawn room
+    spawn_rooms = [r for r in rooms if r.room_type == "spawn"]
+    if len(spawn_rooms) != 1:
+        return False, f"Found {len(spawn_rooms)} spawn rooms, need exactly 1"
+    
+    # Check for all required special rooms
+    boss_rooms = [r for r in rooms if r.room_type == "boss"]
+    shop_rooms = [r for r in rooms if r.room_type == "shop"]
+    chest_unlocked_rooms = [r for r in rooms if r.room_type == "chest_unlocked"]
+    chest_locked_rooms = [r for r in rooms if r.room_type == "chest_locked"]
+    
+    if len(boss_rooms) != 1:
+        return False, f"Found {len(boss_rooms)} boss rooms, need exactly 1"
+    if len(shop_rooms) != 1:
+        return False, f"Found {len(shop_rooms)} shop rooms, need exactly 1"
+    if len(chest_unlocked_rooms) != 1:
+        return False, f"Found {len(chest_unlocked_rooms)} unlocked chest rooms, need exactly 1"
+    if len(chest_locked_rooms) != 2:
+        return False, f"Found {len(chest_locked_rooms)} locked chest rooms, need exactly 2"
+    
+    # STRICT: All special rooms (except spawn) must have exactly 1 connection (dead ends)
+    connection_violations = []
+    for room in rooms:
+        connection_count = len(room.connections) if hasattr(room, 'connections') else 0
+        
+        # Special rooms (boss, shop, chests) must have exactly 1 connection
+        if room.room_type in ["boss", "shop", "chest_unlocked", "chest_locked"]:
+            if connection_count != 1:
+                connection_violations.append(f"{room.room_type} has {connection_count} connections, must have exactly 1 (dead end)")
+        
+        # Spawn room can have multiple connections
+        elif room.room_type == "spawn":
+            if connection_count == 0:
+                connection_violations.append(f"spawn has {connection_count} connections, must have at least 1")
+    
+    if connection_violations:
+        return False, f"Dead end violations: {'; '.join(connection_violations)}"
+    
+    # Check spawn connections (only unlocked chests should connect directly to spawn)
+    spawn_room = spawn_rooms[0]
+    invalid_spawn_connections = []
+    if hasattr(spawn_room, 'connections'):
+        for connected_room in spawn_room.connections:
+            if connected_room.room_type != "chest_unlocked" and connected_room.room_type != "normal":
+                invalid_spawn_connections.append(connected_room.room_type)
+    
+    if invalid_spawn_connections:
+        return False, f"Invalid direct connections to spawn: {invalid_spawn_connections}"
+    
+    # CRITICAL: Check actual tilemap connectivity using BFS
+    spawn_center_x = (spawn_room.rect.x // config.tile_size) + 6  # Center of 14x14 room (offset 6)
+    spawn_center_y = (spawn_room.rect.y // config.tile_size) + 6
+    
+    # BFS to find all reachable tiles
+    visited = set()
+    queue = [(spawn_center_x, spawn_center_y)]
+    visited.add((spawn_center_x, spawn_center_y))
+    
+    directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+    
+    while queue:
+        current_x, current_y = queue.pop(0)
+        
+        for dx, dy in directions:
+            next_x = current_x + dx
+            next_y = current_y + dy
+            
+            if (0 <= next_x < config.grid_width and 0 <= next_y < config.grid_height and
+                (next_x, next_y) not in visited and
+                tilemap[next_y][next_x] in (FLOOR, DOOR)):
+                
+                visited.add((next_x, next_y))
+                queue.append((next_x, next_y))
+    
+    # Check if all rooms are reachable via tilemap
+    unreachable_rooms = []
+    unreachable_types = []
+    
+    for room in rooms:
+        if room.room_type == "spawn":
+            continue  # Skip spawn room
+        
+        # Check if ANY floor tile in the room is reachable (not just center, which may have items)
+        room_floor_x = room.rect.x // config.tile_size
+        room_floor_y = room.rect.y // config.tile_size
+        
+        room_reachable = False
+        for dy in range(14):  # 14x14 room floor
+            for dx in range(14):
+                check_x = room_floor_x + dx
+                check_y = room_floor_y + dy
+                if (check_x, check_y) in visited and tilemap[check_y][check_x] == FLOOR:  # Floor tile that's reachable
+                    room_reachable = True
+                    break
+            if room_reachable:
+                break
+        
+        if not room_reachable:
+            unreachable_rooms.append(room)
+            unreachable_types.append(room.room_type)
+    
+    if unreachable_rooms:
+        return False, f"Map connectivity failed: {len(unreachable_rooms)} rooms unreachable from spawn via floor tiles. Unreachable types: {unreachable_types}"
+    
+    print(f"✅ Tilemap connectivity validated: All {len(rooms)} rooms reachable from spawn")
+    return True, "World is valid"
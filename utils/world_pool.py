@@ -0,0 +1,58 @@
+"""
+Background pre-generation - a small queue of ready-to-play worlds filled by the world generation pool
+"""
+import random
+from collections import deque
+from utils.world_gen import describe_world
+
+class WorldPool:
+    """Keeps up to size validated worlds generated ahead of time
+
+    Worlds are made on a process pool (from start_pool, shared with generate_world_parallel)
+    as WorldDescriptions, so the game loop only pays for poll() (checking which finished)
+    and for rebuilding the one it pops."""
+
+    def __init__(self, config, executor, size=2, rng=None):
+        self.config = config
+        self.executor = executor
+        self.size = size
+        self.rng = rng if rng is not None else random  # Where the pre-generated worlds' seeds come from
+        self.ready = deque()  # Finished WorldDescriptions, oldest first
+        self.pending = deque()  # Futures in submission order
+        self.poll()
+
+    def __len__(self):
+        return len(self.ready)
+
+    def poll(self):
+        """Collect finished worlds and queue new ones until size are ready or on the way, call once a frame"""
+        while self.pending and self.pending[0].done():
+            future = self.pending.popleft()
+            try:
+                description = future.result()
+            except Exception as e:
+                print(f"❌ Background world generation failed with error - {e}")
+                description = None
+            if description is not None:
+                self.ready.append(description)
+
+        while len(self.ready) + len(self.pending) < self.size:
+            seed = self.rng.randrange(1 << 32)
+            self.pending.append(self.executor.submit(describe_world, seed, self.config))
+
+    def pop(self):
+        """Take the oldest ready world (starting a replacement), or None if none has finished yet"""
+        self.poll()
+        if not self.ready:
+            return None
+        description = self.ready.popleft()
+        self.poll()
+        return description.to_world()
+
+    def close(self):
+        """Stop generating - queued worlds are dropped, a world being made is left to finish
+
+        The executor is the caller's and stays up."""
+        for future in self.pending:
+            future.cancel()
+        self.pending.clear()